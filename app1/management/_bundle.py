@@ -0,0 +1,144 @@
+import hashlib
+import io
+import json
+import tarfile
+
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from django.core.management import CommandError
+
+from polib import POFile, pofile
+
+from ._helpers import safe_read_pofile, validate_project_name
+
+MANIFEST_NAME = 'manifest.json'
+CHUNK_SIZE = 1024 * 1024
+
+
+class BundleFile(NamedTuple):
+    app_label: str
+    locale: str
+    path: Path
+
+
+def get_bundle_file_name(app_label: str, locale: str, project_name: str) -> str:
+    return f'{app_label}/{locale}/{validate_project_name(project_name)}'
+
+
+def get_checksum(stream) -> str:
+    checksum = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def get_source_checksum(po: POFile) -> str:
+    """Checksum the strings of a po file, leaving out everything a translator
+    changes, so a translated file has the same checksum as the exported one.
+    Entries are sorted since translation tools may reorder them"""
+    checksum = hashlib.sha256()
+    for source in sorted(
+        f'{entry.msgctxt or ""}\x04{entry.msgid}\x00{entry.msgid_plural}'
+        for entry in po
+    ):
+        checksum.update(f'{source}\n'.encode('utf-8'))
+    return checksum.hexdigest()
+
+
+def write_bundle(bundle_path: Path, project_name: str, files: List[BundleFile]) -> Dict:
+    """Write every project po file into a single gzipped tar archive. The manifest
+    goes first so the archive can be verified while it is read as a stream. The
+    sha256 of each file records what was sent, source_sha256 is what a
+    translated file is verified against"""
+    manifest = {'project': project_name, 'files': []}
+
+    for bundle_file in files:
+        with open(bundle_file.path, 'rb') as po_file:
+            checksum = get_checksum(po_file)
+        po = safe_read_pofile(bundle_file.path)
+
+        manifest['files'].append(
+            {
+                'name': get_bundle_file_name(
+                    bundle_file.app_label, bundle_file.locale, project_name
+                ),
+                'app': bundle_file.app_label,
+                'locale': bundle_file.locale,
+                'sha256': checksum,
+                'source_sha256': get_source_checksum(po),
+                'entries': len(po),
+            }
+        )
+
+    manifest_data = json.dumps(manifest, indent=2).encode('utf-8')
+    manifest_info = tarfile.TarInfo(MANIFEST_NAME)
+    manifest_info.size = len(manifest_data)
+
+    with tarfile.open(bundle_path, 'w:gz') as bundle:
+        bundle.addfile(manifest_info, io.BytesIO(manifest_data))
+        for bundle_file, file_info in zip(files, manifest['files']):
+            bundle.add(bundle_file.path, arcname=file_info['name'], recursive=False)
+
+    return manifest
+
+
+def read_bundle(bundle_path: Path) -> Iterator[Tuple[Dict, Dict, POFile]]:
+    """Read an archive created by write_bundle member by member, yielding the
+    manifest, the manifest record and the parsed po file of each project file.
+    Translated files are accepted as long as they hold the exported strings.
+    Raises CommandError when a file is missing, unexpected or corrupted"""
+    try:
+        bundle = tarfile.open(bundle_path, 'r|gz')
+    except (IOError, tarfile.TarError) as error:
+        raise CommandError(error)
+
+    with bundle:
+        members = iter(bundle)
+        manifest_member = next(members, None)
+
+        if manifest_member is None or manifest_member.name != MANIFEST_NAME:
+            raise CommandError(f'[{bundle_path}] does not start with a manifest')
+
+        try:
+            manifest = json.load(bundle.extractfile(manifest_member))
+        except ValueError as error:
+            raise CommandError(f'Invalid manifest in [{bundle_path}]: {error}')
+
+        pending = {file_info['name']: file_info for file_info in manifest['files']}
+
+        for member in members:
+            if member.isdir():
+                continue
+
+            file_info = pending.pop(member.name, None)
+            if not member.isfile() or file_info is None:
+                raise CommandError(f'Unexpected file in bundle: [{member.name}]')
+
+            data = bundle.extractfile(member).read()
+
+            try:
+                po = pofile(data.decode('utf-8'))
+            except (UnicodeDecodeError, IOError, ValueError) as error:
+                raise CommandError(f'[{member.name}]: {error}')
+
+            if len(po) != file_info['entries']:
+                raise CommandError(
+                    f"[{member.name}] has {len(po)} entries, "
+                    f"{file_info['entries']} expected"
+                )
+
+            # Bundles written before source checksums were recorded can only
+            # be checked against the exported file itself
+            if 'source_sha256' in file_info:
+                if get_source_checksum(po) != file_info['source_sha256']:
+                    raise CommandError(
+                        f'[{member.name}] does not hold the exported strings'
+                    )
+            elif hashlib.sha256(data).hexdigest() != file_info['sha256']:
+                raise CommandError(f'Checksum mismatch for [{member.name}]')
+
+            yield manifest, file_info, po
+
+        if pending:
+            raise CommandError(f'Missing files in bundle: {sorted(pending)}')
@@ -0,0 +1,381 @@
+import csv
+import json
+
+from pathlib import Path
+from typing import Iterable, Iterator
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from django.core.management import CommandError
+
+from polib import POEntry
+
+from ._helpers import safe_read_pofile
+
+EXCHANGE_FORMATS = ('po', 'csv', 'xliff', 'xliff2')
+# Both XLIFF versions are .xlf files, XLIFF 2.0 gets its own name so one never
+# overwrites the other. The reader tells them apart by their content
+EXCHANGE_EXTENSIONS = {
+    'po': '.po',
+    'csv': '.csv',
+    'xliff': '.xlf',
+    'xliff2': '.xliff2.xlf',
+}
+
+XLIFF_12_NAMESPACE = 'urn:oasis:names:tc:xliff:document:1.2'
+XLIFF_20_NAMESPACE = 'urn:oasis:names:tc:xliff:document:2.0'
+
+CSV_COLUMNS = (
+    'msgctxt',
+    'msgid',
+    'msgid_plural',
+    'msgstr',
+    'msgstr_plural',
+    'comment',
+    'tcomment',
+    'occurrences',
+    'flags',
+)
+
+
+def get_exchange_path(po_path: Path, exchange_format: str) -> Path:
+    return Path(po_path).with_suffix(EXCHANGE_EXTENSIONS[exchange_format])
+
+
+def format_occurrences(entry: POEntry) -> str:
+    return ' '.join(
+        f'{file}:{line}' if line else file for file, line in entry.occurrences
+    )
+
+
+def parse_occurrences(text: str) -> list:
+    occurrences = []
+    for occurrence in (text or '').split():
+        file, _, line = occurrence.rpartition(':')
+        occurrences.append((file, line) if file else (line, ''))
+    return occurrences
+
+
+def new_entry(**fields) -> POEntry:
+    return POEntry(
+        msgctxt=fields.get('msgctxt') or None,
+        msgid=fields.get('msgid') or '',
+        msgid_plural=fields.get('msgid_plural') or '',
+        msgstr=fields.get('msgstr') or '',
+        msgstr_plural=fields.get('msgstr_plural') or {},
+        comment=fields.get('comment') or '',
+        tcomment=fields.get('tcomment') or '',
+        occurrences=parse_occurrences(fields.get('occurrences')),
+        flags=[flag for flag in (fields.get('flags') or '').split(',') if flag],
+    )
+
+
+def get_plural_forms(entry: POEntry) -> list:
+    return sorted((entry.msgstr_plural or {0: '', 1: ''}).items())
+
+
+# CSV
+
+
+def write_csv(entries: Iterable[POEntry], path: Path) -> int:
+    count = 0
+
+    with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CSV_COLUMNS)
+
+        for entry in entries:
+            writer.writerow(
+                (
+                    entry.msgctxt or '',
+                    entry.msgid,
+                    entry.msgid_plural,
+                    entry.msgstr,
+                    json.dumps(entry.msgstr_plural) if entry.msgstr_plural else '',
+                    entry.comment,
+                    entry.tcomment,
+                    format_occurrences(entry),
+                    ','.join(entry.flags),
+                )
+            )
+            count += 1
+
+    return count
+
+
+def read_csv(path: Path) -> Iterator[POEntry]:
+    # Spreadsheets often start the file with a BOM, which would otherwise end
+    # up in the name of the first column
+    with open(path, encoding='utf-8-sig', newline='') as csv_file:
+        for row in csv.DictReader(csv_file):
+            msgstr_plural = row.get('msgstr_plural')
+            if msgstr_plural:
+                msgstr_plural = json.loads(msgstr_plural)
+                msgstr_plural = {
+                    int(index): text for index, text in msgstr_plural.items()
+                }
+            yield new_entry(**{**row, 'msgstr_plural': msgstr_plural})
+
+
+# XLIFF 1.2
+
+
+def get_xliff_12_metadata(entry: POEntry) -> str:
+    contexts = ''.join(
+        f'<context context-type="x-po-{name}">{escape(value)}</context>'
+        for name, value in (
+            ('msgctxt', entry.msgctxt or ''),
+            ('occurrences', format_occurrences(entry)),
+            ('flags', ','.join(entry.flags)),
+        )
+        if value
+    )
+    notes = ''.join(
+        f'<note from="{author}">{escape(note)}</note>'
+        for author, note in (
+            ('developer', entry.comment),
+            ('translator', entry.tcomment),
+        )
+        if note
+    )
+
+    if contexts:
+        contexts = (
+            '<context-group name="po-entry" purpose="information">'
+            f'{contexts}</context-group>'
+        )
+
+    return contexts + notes
+
+
+def write_xliff_12(
+    entries: Iterable[POEntry], path: Path, source_language: str, target_language: str
+) -> int:
+    count = 0
+
+    with open(path, 'w', encoding='utf-8') as xliff_file:
+        xliff_file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<xliff version="1.2" xmlns="{XLIFF_12_NAMESPACE}">\n'
+            f'<file original="django.po" datatype="po" '
+            f'source-language={quoteattr(source_language)} '
+            f'target-language={quoteattr(target_language)}>\n'
+            '<body>\n'
+        )
+
+        for count, entry in enumerate(entries, start=1):
+            metadata = get_xliff_12_metadata(entry)
+
+            if entry.msgid_plural:
+                xliff_file.write(f'<group id="{count}" restype="x-gettext-plurals">')
+                xliff_file.write(metadata)
+                for index, msgstr in get_plural_forms(entry):
+                    source = entry.msgid if index == 0 else entry.msgid_plural
+                    xliff_file.write(
+                        f'<trans-unit id="{count}[{index}]">'
+                        f'<source>{escape(source)}</source>'
+                        f'<target>{escape(msgstr)}</target></trans-unit>'
+                    )
+                xliff_file.write('</group>\n')
+            else:
+                xliff_file.write(
+                    f'<trans-unit id="{count}">'
+                    f'<source>{escape(entry.msgid)}</source>'
+                    f'<target>{escape(entry.msgstr)}</target>'
+                    f'{metadata}</trans-unit>\n'
+                )
+
+        xliff_file.write('</body>\n</file>\n</xliff>\n')
+
+    return count
+
+
+def read_xliff_metadata(element, tag) -> dict:
+    fields = {}
+
+    for context in element.iter(tag('context')):
+        name = context.get('context-type', '')
+        if name.startswith('x-po-'):
+            fields[name[len('x-po-'):]] = context.text or ''
+
+    for note in element.findall(tag('note')):
+        if note.get('from') == 'developer':
+            fields['comment'] = note.text or ''
+        elif note.get('from') == 'translator':
+            fields['tcomment'] = note.text or ''
+
+    return fields
+
+
+def read_xliff_12(path: Path) -> Iterator[POEntry]:
+    def tag(name):
+        return f'{{{XLIFF_12_NAMESPACE}}}{name}'
+
+    depth_in_group = 0
+
+    for event, element in ElementTree.iterparse(str(path), events=('start', 'end')):
+        is_plural_group = element.get('restype') == 'x-gettext-plurals'
+
+        if element.tag == tag('group') and is_plural_group:
+            depth_in_group += 1 if event == 'start' else -1
+            if event == 'start':
+                continue
+
+            units = element.findall(tag('trans-unit'))
+            yield new_entry(
+                msgid=units[0].findtext(tag('source')) if units else '',
+                msgid_plural=units[1].findtext(tag('source')) if len(units) > 1 else '',
+                msgstr_plural={
+                    index: unit.findtext(tag('target')) or ''
+                    for index, unit in enumerate(units)
+                },
+                **read_xliff_metadata(element, tag),
+            )
+            element.clear()
+
+        elif event == 'end' and element.tag == tag('trans-unit') and not depth_in_group:
+            yield new_entry(
+                msgid=element.findtext(tag('source')),
+                msgstr=element.findtext(tag('target')),
+                **read_xliff_metadata(element, tag),
+            )
+            element.clear()
+
+
+# XLIFF 2.0
+
+
+def write_xliff_20(
+    entries: Iterable[POEntry], path: Path, source_language: str, target_language: str
+) -> int:
+    count = 0
+
+    with open(path, 'w', encoding='utf-8') as xliff_file:
+        xliff_file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<xliff version="2.0" xmlns="{XLIFF_20_NAMESPACE}" '
+            f'srcLang={quoteattr(source_language)} '
+            f'trgLang={quoteattr(target_language)}>\n'
+            '<file id="django.po">\n'
+        )
+
+        for count, entry in enumerate(entries, start=1):
+            notes = [
+                f'<note category="{category}">{escape(value)}</note>'
+                for category, value in (
+                    ('developer', entry.comment),
+                    ('translator', entry.tcomment),
+                    ('x-po-msgctxt', entry.msgctxt or ''),
+                    ('x-po-occurrences', format_occurrences(entry)),
+                    ('x-po-flags', ','.join(entry.flags)),
+                )
+                if value
+            ]
+
+            if entry.msgid_plural:
+                segments = [
+                    (
+                        f'plural-{index}',
+                        entry.msgid if index == 0 else entry.msgid_plural,
+                        msgstr,
+                    )
+                    for index, msgstr in get_plural_forms(entry)
+                ]
+            else:
+                segments = [('s', entry.msgid, entry.msgstr)]
+
+            xliff_file.write(f'<unit id="u{count}">')
+            if notes:
+                xliff_file.write(f"<notes>{''.join(notes)}</notes>")
+            for segment_id, source, target in segments:
+                xliff_file.write(
+                    f'<segment id="{segment_id}"><source>{escape(source)}</source>'
+                    f'<target>{escape(target)}</target></segment>'
+                )
+            xliff_file.write('</unit>\n')
+
+        xliff_file.write('</file>\n</xliff>\n')
+
+    return count
+
+
+def read_xliff_20(path: Path) -> Iterator[POEntry]:
+    def tag(name):
+        return f'{{{XLIFF_20_NAMESPACE}}}{name}'
+
+    for _, element in ElementTree.iterparse(str(path)):
+        if element.tag != tag('unit'):
+            continue
+
+        fields = {}
+        for note in element.iter(tag('note')):
+            category = note.get('category', '')
+            name = category[len('x-po-'):] if category.startswith('x-po-') else None
+            if category == 'developer':
+                fields['comment'] = note.text or ''
+            elif category == 'translator':
+                fields['tcomment'] = note.text or ''
+            elif name:
+                fields[name] = note.text or ''
+
+        segments = element.findall(tag('segment'))
+        if segments and segments[0].get('id', '').startswith('plural-'):
+            fields['msgid'] = segments[0].findtext(tag('source'))
+            if len(segments) > 1:
+                fields['msgid_plural'] = segments[1].findtext(tag('source'))
+            fields['msgstr_plural'] = {
+                int(segment.get('id')[len('plural-'):]): segment.findtext(tag('target'))
+                or ''
+                for segment in segments
+            }
+        elif segments:
+            fields['msgid'] = segments[0].findtext(tag('source'))
+            fields['msgstr'] = segments[0].findtext(tag('target'))
+
+        yield new_entry(**fields)
+        element.clear()
+
+
+def get_xliff_version(path: Path) -> str:
+    for _, element in ElementTree.iterparse(str(path), events=('start',)):
+        return element.get('version', '1.2')
+    return '1.2'
+
+
+def read_project_entries(path: Path) -> Iterator[POEntry]:
+    """Read the entries of a po project file in any of the exchange formats,
+    one at a time. XLIFF and CSV files are never fully loaded in memory"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    try:
+        if suffix == '.csv':
+            yield from read_csv(path)
+        elif suffix in ('.xlf', '.xliff'):
+            if get_xliff_version(path).startswith('2'):
+                yield from read_xliff_20(path)
+            else:
+                yield from read_xliff_12(path)
+        else:
+            yield from safe_read_pofile(path)
+    except (IOError, ValueError, csv.Error, ElementTree.ParseError) as error:
+        raise CommandError(f'Unable to read [{path}]: {error}')
+
+
+def write_project_entries(
+    entries: Iterable[POEntry],
+    path: Path,
+    exchange_format: str,
+    source_language: str,
+    target_language: str,
+) -> int:
+    """Write po project entries as CSV or XLIFF as they are produced, returns
+    the number of entries written"""
+    if exchange_format == 'csv':
+        return write_csv(entries, path)
+    if exchange_format == 'xliff':
+        return write_xliff_12(entries, path, source_language, target_language)
+    if exchange_format == 'xliff2':
+        return write_xliff_20(entries, path, source_language, target_language)
+
+    raise CommandError(f'Unsupported format: [{exchange_format}]')
@@ -1,33 +1,69 @@
+import argparse
+import os
+
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, Iterable, List, Tuple
 
-from django.apps import AppConfig, apps
 from django.conf import settings
 from django.core.management import CommandError
 from django.utils.translation import to_locale
 
 from polib import POEntry, POFile, pofile
 
-ALL_APPS: List[AppConfig] = [
-    app
-    for app in apps.get_app_configs()
-    if 'django' not in app.name
-]
+# Apps read from the manifest by the standalone CLI, when Django is not set up
+_manifest_apps = None
+
+
+def use_manifest_apps(manifest_apps: List):
+    global _manifest_apps
+    _manifest_apps = manifest_apps
+
+
+def get_all_apps() -> List:
+    if _manifest_apps is not None:
+        return _manifest_apps
+
+    from django.apps import apps
+
+    return [app for app in apps.get_app_configs() if 'django' not in app.name]
+
+
+def get_supported_languages() -> List[str]:
+    return [code for (code, _) in settings.LANGUAGES if code != settings.LANGUAGE_CODE]
+
 
-SUPPORTED_LANGUAGES: List[str] = [
-    code for (code, _) in settings.LANGUAGES if code != settings.LANGUAGE_CODE
-]
+def __getattr__(name):
+    # ALL_APPS and SUPPORTED_LANGUAGES are computed when a command imports them, so
+    # they can come either from the app registry or from the manifest
+    if name == 'ALL_APPS':
+        return get_all_apps()
+    if name == 'SUPPORTED_LANGUAGES':
+        return get_supported_languages()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def get_supported_locale(locale: str) -> str:
-    if locale in SUPPORTED_LANGUAGES:
+    if locale in get_supported_languages():
         return locale
     else:
         raise CommandError(f"Unsupported locale: [{locale}]")
 
 
+PROJECT_COMMENT_PREFIX = 'project='
+
+
+def positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive number')
+    return number
+
+
 def get_po_project_comment(project_name: str) -> str:
-    return f'project={project_name}'
+    return f'{PROJECT_COMMENT_PREFIX}{project_name}'
 
 
 def get_po_file_path(app_path: str, locale: str, project_name: str = None) -> Path:
@@ -55,11 +91,89 @@ def safe_read_pofile(path: str) -> POFile:
         raise CommandError(error)
 
 
+def atomic_save_pofile(po: POFile, path: str = None):
+    """Save a po file through a temporary file in the same directory, so
+    readers never see a partially written catalog"""
+    path = Path(path or po.fpath)
+    temp_path = path.with_name(f'.{path.name}.tmp')
+
+    po.save(str(temp_path))
+    os.replace(temp_path, path)
+    po.fpath = str(path)
+
+
+@lru_cache(maxsize=4096)
+def parse_comment(comment: str) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """Split extracted comments into the project tags and the other lines.
+    Many entries share the same comment, so each one is only parsed once"""
+    projects = set()
+    lines = []
+
+    for line in comment.splitlines():
+        line = line.strip()
+        if line.startswith(PROJECT_COMMENT_PREFIX):
+            projects.add(line[len(PROJECT_COMMENT_PREFIX):])
+        elif line:
+            lines.append(line)
+
+    return frozenset(projects), tuple(lines)
+
+
+def get_entry_projects(entry: POEntry) -> FrozenSet[str]:
+    """Return the project names tagged in the extracted comments of an entry"""
+    if not entry.comment:
+        return frozenset()
+    return parse_comment(entry.comment)[0]
+
+
+def get_project_name(project_name_comment: str) -> str:
+    return project_name_comment[len(PROJECT_COMMENT_PREFIX):]
+
+
 def has_project(entry: POEntry, project_name_comment: str) -> bool:
-    return project_name_comment in entry.comment
+    return get_project_name(project_name_comment) in get_entry_projects(entry)
+
+
+def set_entry_comment(entry: POEntry, projects: Iterable[str], lines: Iterable[str]):
+    entry.comment = '\n'.join(
+        [*lines, *map(get_po_project_comment, sorted(projects))]
+    )
 
 
 def add_project(entry: POEntry, project_name_comment: str) -> POEntry:
-    entry.comment = f"{project_name_comment}"
+    """Tag an entry with a project, keeping its other comments and tags"""
+    projects, lines = parse_comment(entry.comment or '')
+
+    if get_project_name(project_name_comment) not in projects:
+        set_entry_comment(
+            entry, projects | {get_project_name(project_name_comment)}, lines
+        )
+
+    return entry
+
+
+def remove_project(entry: POEntry, project_name_comment: str) -> POEntry:
+    """Remove a project tag from an entry, keeping its other comments and tags"""
+    projects, lines = parse_comment(entry.comment or '')
+
+    if get_project_name(project_name_comment) in projects:
+        set_entry_comment(
+            entry, projects - {get_project_name(project_name_comment)}, lines
+        )
+
+    return entry
+
+
+class ProjectIndex:
+    """The entries of a catalog by project name, built in a single pass so
+    looking up the entries of a project does not scan every comment again"""
+
+    def __init__(self, entries: Iterable[POEntry]):
+        self.entries = defaultdict(list)
+
+        for entry in entries:
+            for project_name in get_entry_projects(entry):
+                self.entries[project_name].append(entry)
 
-    return entry
\ No newline at end of file
+    def get_entries(self, project_name_comment: str) -> List[POEntry]:
+        return self.entries.get(get_project_name(project_name_comment), [])
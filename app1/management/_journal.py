@@ -0,0 +1,187 @@
+import hashlib
+import json
+import shutil
+
+from pathlib import Path
+from typing import List, Optional
+
+from django.core.management import CommandError
+
+JOURNAL_DIR = Path('.i18n_journal')
+
+
+def get_content_hash(path: Path) -> Optional[str]:
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def add_journal_arguments(parser):
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        default=False,
+        required=False,
+        help=(
+            'Continue an interrupted run with the same arguments, skipping the files '
+            'that were already processed'
+        ),
+    )
+
+    parser.add_argument(
+        '--rollback',
+        action='store_true',
+        default=False,
+        required=False,
+        help='Restore the files changed by an interrupted run with the same arguments',
+    )
+
+
+class RunJournal:
+    """Records the files a command is about to change, with their content
+    hashes and a backup of the originals, so an interrupted run can be resumed
+    or rolled back. The journal is removed once the run finishes"""
+
+    def __init__(self, command: str, arguments: List[str], enabled: bool = True):
+        self.arguments = [command, *map(str, arguments)]
+        key = hashlib.sha1('\0'.join(self.arguments).encode('utf-8')).hexdigest()
+        self.journal_dir = JOURNAL_DIR / f'{command}-{key[:12]}'
+        self.journal_path = self.journal_dir / 'journal.json'
+        self.backups_dir = self.journal_dir / 'backups'
+        self.enabled = enabled
+        self.operations = {}
+        # Values resolved by the first run, e.g. a generated project name, that
+        # a resumed run must reuse
+        self.state = {}
+
+    def exists(self) -> bool:
+        return self.journal_path.exists()
+
+    def load(self):
+        try:
+            with open(self.journal_path, encoding='utf-8') as journal_file:
+                journal = json.load(journal_file)
+                self.operations = journal['operations']
+                self.state = journal.get('state', {})
+        except (IOError, ValueError, KeyError) as error:
+            raise CommandError(
+                f'Unable to read the journal [{self.journal_path}]: {error}'
+            )
+
+    def save(self):
+        self.backups_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.journal_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as journal_file:
+            json.dump(
+                {
+                    'arguments': self.arguments,
+                    'state': self.state,
+                    'operations': self.operations,
+                },
+                journal_file,
+                indent=2,
+            )
+        temp_path.replace(self.journal_path)
+
+    def start(self, resume: bool = False):
+        """Start a new run, or continue the interrupted one when resuming. Files
+        that were being written when the run stopped are restored first. The
+        journal is only written to disk once the first file is processed"""
+        if not self.enabled:
+            return
+
+        if not self.exists():
+            if resume:
+                raise CommandError(
+                    'There is no interrupted run with the same arguments to resume'
+                )
+            return
+
+        if not resume:
+            raise CommandError(
+                f'A previous run was interrupted ({self.journal_path}), '
+                'use --resume to continue it or --rollback to undo it'
+            )
+
+        self.load()
+        for path, operation in self.operations.items():
+            if operation['status'] == 'planned':
+                self.restore(path, operation)
+                operation['status'] = 'restored'
+        self.save()
+
+    def is_completed(self, path: Path) -> bool:
+        """Check if a file was already processed and has not changed since"""
+        operation = self.operations.get(str(path))
+
+        return bool(
+            self.enabled
+            and operation
+            and operation['status'] == 'completed'
+            and operation['after'] == get_content_hash(path)
+        )
+
+    def plan(self, path: Path, action: str):
+        if not self.enabled:
+            return
+
+        key = str(path)
+        operation = self.operations.get(key)
+
+        # Keep the backup of the very first original across resumed runs
+        if operation is None or operation['backup'] is None:
+            backup_name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+            operation = {
+                'before': get_content_hash(path),
+                'backup': str(self.backups_dir / backup_name),
+            }
+            if operation['before'] is not None:
+                self.backups_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, operation['backup'])
+            self.operations[key] = operation
+
+        operation.update({'action': action, 'status': 'planned', 'after': None})
+        self.save()
+
+    def complete(self, path: Path):
+        """Mark a file as processed, files processed without changes are also
+        recorded so resumed runs don't parse them again"""
+        if not self.enabled:
+            return
+
+        content_hash = get_content_hash(path)
+        operation = self.operations.setdefault(
+            str(path), {'action': 'none', 'before': content_hash, 'backup': None}
+        )
+        operation.update({'status': 'completed', 'after': content_hash})
+        self.save()
+
+    def restore(self, path: str, operation: dict):
+        if operation['before'] is None:
+            Path(path).unlink(missing_ok=True)
+        elif operation['backup']:
+            shutil.copy2(operation['backup'], path)
+
+    def rollback(self) -> List[str]:
+        """Restore every file touched by the interrupted run and remove the
+        journal, returns the restored paths"""
+        if not self.exists():
+            raise CommandError('There is no interrupted run to roll back')
+
+        self.load()
+        restored = []
+        for path, operation in self.operations.items():
+            if operation['before'] != get_content_hash(Path(path)):
+                self.restore(path, operation)
+                restored.append(path)
+
+        self.finish()
+        return restored
+
+    def finish(self):
+        if self.enabled and self.journal_dir.exists():
+            shutil.rmtree(self.journal_dir)
+            if not any(JOURNAL_DIR.iterdir()):
+                JOURNAL_DIR.rmdir()
@@ -0,0 +1,65 @@
+import json
+
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from django.core.management import CommandError
+
+MANIFEST_PATH = Path('.i18n_manifest.json')
+MANIFEST_VERSION = 1
+
+
+class ManifestApp(NamedTuple):
+    """The attributes of an AppConfig used by the PO workflow commands"""
+
+    label: str
+    name: str
+    path: str
+
+
+def build_manifest() -> Dict:
+    """Collect the apps and languages of a configured Django project"""
+    from django.conf import settings
+
+    from ._helpers import get_all_apps
+
+    return {
+        'version': MANIFEST_VERSION,
+        'language_code': settings.LANGUAGE_CODE,
+        'languages': [[code, str(name)] for code, name in settings.LANGUAGES],
+        'apps': [
+            {'label': app.label, 'name': app.name, 'path': str(app.path)}
+            for app in get_all_apps()
+        ],
+    }
+
+
+def write_manifest(manifest: Dict, path: Path = MANIFEST_PATH):
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    temp_path.replace(path)
+
+
+def read_manifest(path: Path = MANIFEST_PATH) -> Dict:
+    try:
+        with open(path, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except FileNotFoundError:
+        raise CommandError(
+            f'Unable to find [{path}], run `python manage.py manifestmessages` first'
+        )
+    except ValueError as error:
+        raise CommandError(f'Unable to read [{path}]: {error}')
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise CommandError(
+            f'[{path}] was written by another version, '
+            'run `python manage.py manifestmessages` again'
+        )
+
+    return manifest
+
+
+def get_manifest_apps(manifest: Dict) -> List[ManifestApp]:
+    return [ManifestApp(**app) for app in manifest['apps']]
@@ -0,0 +1,103 @@
+import heapq
+import math
+
+from collections import defaultdict
+from typing import Iterable, Iterator, List, Tuple
+
+from polib import POEntry
+
+from ._summary import count_words
+
+
+def get_entry_template(entry: POEntry) -> str:
+    return entry.occurrences[0][0] if entry.occurrences else ''
+
+
+def group_by_template(entries: Iterable[POEntry]) -> List[Tuple[str, List[POEntry]]]:
+    groups = defaultdict(list)
+    for entry in entries:
+        groups[get_entry_template(entry)].append(entry)
+    return list(groups.items())
+
+
+def split_group(entries: List[POEntry], max_words: int) -> Iterator[List[POEntry]]:
+    """Split the entries of a template bigger than a partition into consecutive
+    chunks of at most max_words words, an entry is never split"""
+    chunk = []
+    chunk_words = 0
+
+    for entry in entries:
+        words = count_words(entry.msgid)
+        if chunk and chunk_words + words > max_words:
+            yield chunk
+            chunk = []
+            chunk_words = 0
+        chunk.append(entry)
+        chunk_words += words
+
+    if chunk:
+        yield chunk
+
+
+class Partitioner:
+    """Spread entries over partitions balanced by word count, keeping the
+    entries of a template together unless the template alone is bigger than a
+    partition. With a number of partitions, each group goes to the partition
+    with the fewest words (largest groups first). With a maximum of words, each
+    group goes to the first partition where it fits, or to a new one. Loads are
+    kept across catalogs so the partitions are balanced over the whole run"""
+
+    def __init__(self, partitions: int = 0, max_words: int = 0):
+        self.max_words = max_words
+        self.words = [0] * partitions
+        self.entries = [0] * partitions
+        self.templates = [set() for _ in range(partitions)]
+        self.heap = [(0, index) for index in range(partitions)]
+
+    def assign(self, entries: Iterable[POEntry]) -> Iterator[Tuple[POEntry, int]]:
+        """Yield each entry with the number, starting at 1, of its partition"""
+        groups = group_by_template(entries)
+        total_words = sum(
+            count_words(entry.msgid) for _, group in groups for entry in group
+        )
+        max_words = self.max_words or math.ceil(total_words / len(self.words))
+
+        chunks = [
+            (sum(count_words(entry.msgid) for entry in chunk), template, chunk)
+            for template, group in groups
+            for chunk in split_group(group, max(max_words, 1))
+        ]
+        chunks.sort(key=lambda chunk: chunk[0], reverse=True)
+
+        for words, template, chunk in chunks:
+            index = self.get_partition(words)
+            self.words[index] += words
+            self.entries[index] += len(chunk)
+            self.templates[index].add(template)
+
+            for entry in chunk:
+                yield entry, index + 1
+
+    def get_partition(self, words: int) -> int:
+        if not self.max_words:
+            _, index = heapq.heappop(self.heap)
+            heapq.heappush(self.heap, (self.words[index] + words, index))
+            return index
+
+        for index, load in enumerate(self.words):
+            if load + words <= self.max_words:
+                return index
+
+        self.words.append(0)
+        self.entries.append(0)
+        self.templates.append(set())
+        return len(self.words) - 1
+
+    def get_summary(self) -> List[Tuple[int, int, int, int]]:
+        """Return the number, entries, words and templates of every partition"""
+        return [
+            (index + 1, entries, words, len(templates))
+            for index, (entries, words, templates) in enumerate(
+                zip(self.entries, self.words, self.templates)
+            )
+        ]
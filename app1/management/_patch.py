@@ -0,0 +1,106 @@
+import os
+
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from polib import POEntry, POFile, pofile
+
+from ._helpers import atomic_save_pofile
+
+
+def get_entry_span(lines: List[bytes], entry: POEntry) -> Optional[Tuple[int, int]]:
+    """Return the first and past-the-end line indexes of the block of an entry.
+    The parser records the line where each entry starts, and entries end at
+    the next blank line"""
+    if not entry.linenum or entry.linenum > len(lines):
+        return None
+
+    start = entry.linenum - 1
+    end = start
+    while end < len(lines) and lines[end].strip():
+        end += 1
+
+    return start, end
+
+
+def is_same_entry(original: POEntry, entry: POEntry) -> bool:
+    return (
+        original.msgid == entry.msgid
+        and original.msgctxt == entry.msgctxt
+        and original.obsolete == entry.obsolete
+    )
+
+
+def parse_blocks(texts: List[str]) -> List[POEntry]:
+    """Parse many entry blocks at once, the parser setup costs more than
+    parsing a few lines"""
+    text = '\n'.join(text if text.endswith('\n') else f'{text}\n' for text in texts)
+    try:
+        return list(pofile(text))
+    except (IOError, ValueError):
+        return []
+
+
+def patch_pofile(po: POFile, changed_entries: Iterable[POEntry]) -> bool:
+    """Write only the blocks of the changed entries, copying every other line
+    of the file as it is. Each replaced block is the exact text a full save
+    would write for the entry; when a block can not be matched to its entry
+    the whole catalog is saved instead. Returns whether the file was patched"""
+    path = Path(po.fpath)
+    changed_entries = list({id(entry): entry for entry in changed_entries}.values())
+    if not changed_entries:
+        return True
+
+    with open(path, 'rb') as po_file:
+        lines = po_file.read().splitlines(keepends=True)
+
+    spans = [get_entry_span(lines, entry) for entry in changed_entries]
+    if None in spans:
+        atomic_save_pofile(po)
+        return False
+
+    originals = [b''.join(lines[start:end]).decode(po.encoding) for start, end in spans]
+    texts = [entry.__unicode__(po.wrapwidth) for entry in changed_entries]
+
+    # Both the blocks on disk and the new texts must hold these entries
+    for parsed in (parse_blocks(originals), parse_blocks(texts)):
+        if len(parsed) != len(changed_entries) or not all(
+            map(is_same_entry, parsed, changed_entries)
+        ):
+            atomic_save_pofile(po)
+            return False
+
+    patches = [
+        (start, end, text.encode(po.encoding))
+        for (start, end), text in zip(spans, texts)
+    ]
+    write_patches(po, path, lines, sorted(patches))
+    return True
+
+
+def write_patches(po: POFile, path: Path, lines: List[bytes], patches: List):
+    temp_path = path.with_name(f'.{path.name}.tmp')
+    position = 0
+    shifts = []
+    shift = 0
+
+    with open(temp_path, 'wb') as po_file:
+        for start, end, block in patches:
+            po_file.writelines(lines[position:start])
+            po_file.write(block)
+            position = end
+
+            shift += block.count(b'\n') - (end - start)
+            shifts.append((end, shift))
+        po_file.writelines(lines[position:])
+
+    os.replace(temp_path, path)
+
+    # Keep the line numbers of the entries in memory right for the next patch
+    if any(line_shift for _, line_shift in shifts):
+        ends = [end for end, _ in shifts]
+        for entry in po:
+            index = bisect_right(ends, entry.linenum - 1) if entry.linenum else 0
+            if index:
+                entry.linenum += shifts[index - 1][1]
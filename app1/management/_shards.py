@@ -0,0 +1,189 @@
+import json
+import zlib
+
+from pathlib import Path
+from typing import Dict, Iterable, List
+from urllib.parse import quote
+
+from django.core.management import CommandError
+
+from polib import POEntry, POFile
+
+from ._helpers import safe_read_pofile
+
+SHARDS_DIR_NAME = 'shards'
+LAYOUT_FILE_NAME = 'layout.json'
+SHARD_MODES = ('template', 'hash')
+DEFAULT_BUCKETS = 64
+MISC_SHARD_KEY = '_misc'
+
+
+def get_shards_dir(po_file: Path) -> Path:
+    return Path(po_file).parent / SHARDS_DIR_NAME
+
+
+def is_sharded(po_file: Path) -> bool:
+    return (get_shards_dir(po_file) / LAYOUT_FILE_NAME).exists()
+
+
+def read_layout(po_file: Path) -> Dict:
+    layout_path = get_shards_dir(po_file) / LAYOUT_FILE_NAME
+    try:
+        with open(layout_path, encoding='utf-8') as layout_file:
+            return json.load(layout_file)
+    except (IOError, ValueError) as error:
+        raise CommandError(f'Invalid shard layout [{layout_path}]: {error}')
+
+
+def get_shard_key(entry: POEntry, layout: Dict) -> str:
+    """Template shards are named after the first occurrence of the entry, hash
+    shards after the bucket of its msgctxt and msgid"""
+    if layout['mode'] == 'hash':
+        key = f"{entry.msgctxt or ''}\x04{entry.msgid}".encode('utf-8')
+        return f"{zlib.crc32(key) % layout['buckets']:04d}"
+
+    if not entry.occurrences:
+        return MISC_SHARD_KEY
+
+    return quote(entry.occurrences[0][0], safe='')
+
+
+def get_shard_paths(po_file: Path) -> List[Path]:
+    return sorted(get_shards_dir(po_file).glob('*.po'))
+
+
+def get_catalog_paths(po_file: Path, file_names: Iterable[str] = None) -> List[Path]:
+    """Return the po files holding the entries of a django.po file: the file
+    itself, or its shards when the catalog is sharded. With template shards,
+    ``file_names`` narrows the result to the shards holding an entry with an
+    occurrence in a matching source file, not only a first occurrence"""
+    po_file = Path(po_file)
+
+    if not is_sharded(po_file):
+        return [po_file] if po_file.exists() else []
+
+    shard_paths = get_shard_paths(po_file)
+    layout = read_layout(po_file)
+    # Layouts written before the files map was recorded can't be narrowed
+    if file_names is None or layout['mode'] != 'template' or 'files' not in layout:
+        return shard_paths
+
+    file_names = list(file_names)
+    keys = {
+        key
+        for source_file, file_keys in layout['files'].items()
+        if any(name in source_file for name in file_names)
+        for key in file_keys
+    }
+    return [shard_path for shard_path in shard_paths if shard_path.stem in keys]
+
+
+def get_catalog_paths_for_entries(
+    po_file: Path, entries: Iterable[POEntry]
+) -> List[Path]:
+    """Return only the shards that can contain the given entries"""
+    po_file = Path(po_file)
+
+    if not is_sharded(po_file):
+        return get_catalog_paths(po_file)
+
+    layout = read_layout(po_file)
+    keys = set()
+    for entry in entries:
+        if layout['mode'] == 'template' and not entry.occurrences:
+            # Without occurrences the entry could be in any shard
+            return get_shard_paths(po_file)
+        keys.add(get_shard_key(entry, layout))
+
+    shards_dir = get_shards_dir(po_file)
+    return [
+        shard_path
+        for shard_path in (shards_dir / f'{key}.po' for key in sorted(keys))
+        if shard_path.exists()
+    ]
+
+
+def split_catalog(po_file: Path, mode: str, buckets: int = DEFAULT_BUCKETS) -> int:
+    """Split a django.po file into shards and remove it, returns the number of
+    shards written. Shards left from a previous split are replaced"""
+    po_file = Path(po_file)
+    po = safe_read_pofile(po_file)
+    layout = {'mode': mode, 'buckets': buckets}
+    shards = {}
+    # Source file -> shards holding an entry with an occurrence in it
+    files = {}
+
+    def new_shard():
+        shard = POFile(wrapwidth=po.wrapwidth)
+        shard.header = po.header
+        shard.metadata = po.metadata
+        shard.metadata_is_fuzzy = po.metadata_is_fuzzy
+        return shard
+
+    for entry in po:
+        key = get_shard_key(entry, layout)
+        if key not in shards:
+            shards[key] = new_shard()
+        shards[key].append(entry)
+
+        if mode == 'template':
+            for source_file, _ in entry.occurrences:
+                files.setdefault(source_file, set()).add(key)
+
+    if not shards:
+        # Keep the metadata of an empty catalog around for the next assembly
+        shards[MISC_SHARD_KEY] = new_shard()
+
+    shards_dir = get_shards_dir(po_file)
+    shards_dir.mkdir(exist_ok=True)
+    for shard_path in get_shard_paths(po_file):
+        shard_path.unlink()
+
+    for key, shard in shards.items():
+        shard.save(str(shards_dir / f'{key}.po'))
+
+    if mode == 'template':
+        layout['files'] = {
+            source_file: sorted(keys) for source_file, keys in sorted(files.items())
+        }
+
+    with open(shards_dir / LAYOUT_FILE_NAME, 'w', encoding='utf-8') as layout_file:
+        json.dump(layout, layout_file, indent=2)
+
+    po_file.unlink()
+    return len(shards)
+
+
+def assemble_catalog(po_file: Path) -> int:
+    """Write the django.po file of a sharded catalog, returns the number of
+    entries written"""
+    po = None
+
+    for shard_path in get_shard_paths(po_file):
+        shard = safe_read_pofile(shard_path)
+        if po is None:
+            po = POFile(wrapwidth=shard.wrapwidth)
+            po.header = shard.header
+            po.metadata = shard.metadata
+            po.metadata_is_fuzzy = shard.metadata_is_fuzzy
+        po.extend(shard)
+
+    if po is None:
+        raise CommandError(f'No shards found for [{po_file}]')
+
+    po.save(str(po_file))
+    return len(po)
+
+
+def unshard_catalog(po_file: Path) -> int:
+    """Assemble a sharded catalog back into a single django.po file and remove
+    its shards"""
+    count = assemble_catalog(po_file)
+    shards_dir = get_shards_dir(po_file)
+
+    for shard_path in get_shard_paths(po_file):
+        shard_path.unlink()
+    (shards_dir / LAYOUT_FILE_NAME).unlink()
+    shards_dir.rmdir()
+
+    return count
@@ -0,0 +1,112 @@
+import json
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable
+
+from polib import POFile
+
+from ._helpers import get_entry_projects, safe_read_pofile
+
+SUMMARY_CACHE_PATH = Path('.i18n_status_cache.json')
+
+
+def get_file_fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return f'{stat.st_mtime_ns}:{stat.st_size}'
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def summarize_pofile(po: POFile) -> Dict:
+    """Count entries by state, words and project tags of a single catalog"""
+    summary = {
+        'total': 0,
+        'translated': 0,
+        'untranslated': 0,
+        'fuzzy': 0,
+        'obsolete': 0,
+        'words': 0,
+        'untranslated_words': 0,
+    }
+    projects = Counter()
+
+    for entry in po:
+        if entry.obsolete:
+            summary['obsolete'] += 1
+            continue
+
+        words = count_words(entry.msgid)
+        summary['total'] += 1
+        summary['words'] += words
+
+        if entry.fuzzy:
+            summary['fuzzy'] += 1
+            summary['untranslated_words'] += words
+        elif entry.translated():
+            summary['translated'] += 1
+        else:
+            summary['untranslated'] += 1
+            summary['untranslated_words'] += words
+
+        projects.update(get_entry_projects(entry))
+
+    summary['projects'] = dict(projects)
+    return summary
+
+
+def merge_summaries(summaries: Iterable[Dict]) -> Dict:
+    """Add up the summaries of the shards of a catalog"""
+    merged = Counter()
+    projects = Counter()
+
+    for summary in summaries:
+        counts = dict(summary)
+        projects.update(counts.pop('projects'))
+        merged.update(counts)
+
+    return {**merged, 'projects': dict(projects)}
+
+
+class SummaryCache:
+    """Per-catalog summaries stored on disk and keyed by the file fingerprint,
+    so a catalog is only parsed again when its size or mtime changes"""
+
+    def __init__(self, cache_path: Path = SUMMARY_CACHE_PATH, enabled: bool = True):
+        self.cache_path = cache_path
+        self.enabled = enabled
+        self.is_dirty = False
+        self.entries = self.load() if enabled else {}
+
+    def load(self) -> Dict:
+        try:
+            with open(self.cache_path, encoding='utf-8') as cache_file:
+                return json.load(cache_file)
+        except (IOError, ValueError):
+            return {}
+
+    def save(self):
+        if not (self.enabled and self.is_dirty):
+            return
+
+        temp_path = self.cache_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(self.entries, cache_file)
+        temp_path.replace(self.cache_path)
+        self.is_dirty = False
+
+    def get_summary(self, po_path: Path) -> Dict:
+        key = str(po_path)
+        fingerprint = get_file_fingerprint(po_path)
+        cached = self.entries.get(key)
+
+        if cached and cached['fingerprint'] == fingerprint:
+            return cached['summary']
+
+        summary = summarize_pofile(safe_read_pofile(po_path))
+        self.entries[key] = {'fingerprint': fingerprint, 'summary': summary}
+        self.is_dirty = True
+
+        return summary
@@ -0,0 +1,38 @@
+import json
+
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+from polib import POEntry
+
+TRAFFIC_DIR = Path('.i18n_traffic')
+# Separator used by gettext between the context and the msgid of an entry
+CONTEXT_SEPARATOR = '\x04'
+
+
+def get_traffic_dir() -> Path:
+    return Path(getattr(settings, 'I18N_TRAFFIC_DIR', TRAFFIC_DIR))
+
+
+def get_traffic_key(entry: POEntry) -> str:
+    if entry.msgctxt:
+        return f'{entry.msgctxt}{CONTEXT_SEPARATOR}{entry.msgid}'
+    return entry.msgid
+
+
+def read_traffic(locale: str) -> Counter:
+    """Add up the estimated lookups of missing translations in a locale over
+    the files written by every process running MissingTranslationsMiddleware"""
+    counts = Counter()
+
+    for traffic_path in sorted(get_traffic_dir().glob('*.json')):
+        try:
+            with open(traffic_path, encoding='utf-8') as traffic_file:
+                counts.update(json.load(traffic_file)['locales'].get(locale, {}))
+        except (IOError, ValueError, KeyError, AttributeError):
+            # A file may belong to a process that is still writing it
+            continue
+
+    return counts
@@ -0,0 +1,163 @@
+import re
+
+from collections import Counter
+from functools import lru_cache
+from typing import List, NamedTuple, Set, Tuple
+
+from polib import POEntry
+
+FORMAT_FLAGS = ('python-format', 'python-brace-format')
+
+PRINTF_PLACEHOLDER = re.compile(
+    r'%(?:\((?P<name>[^)]*)\))?[#0 +-]*(?:\*|\d+)?(?:\.(?:\*|\d+))?'
+    r'[hlL]?(?P<type>[diouxXeEfFgGcrsa%])'
+)
+BRACE_PLACEHOLDER = re.compile(r'{{|}}|{(?P<field>[^{}]*)}')
+HTML_TAG = re.compile(r'<(?P<closing>/?)(?P<tag>[a-zA-Z][\w:-]*)[^<>]*?(?P<void>/?)>')
+
+VOID_TAGS = frozenset(
+    ('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+     'source', 'track', 'wbr')
+)
+
+
+class Placeholders(NamedTuple):
+    printf_named: frozenset
+    printf_positional: Tuple[str, ...]
+    brace: frozenset
+    tags: Tuple[Tuple[str, int], ...]
+
+
+def extract_placeholders(text: str) -> Placeholders:
+    printf_named = set()
+    printf_positional = []
+    for match in PRINTF_PLACEHOLDER.finditer(text):
+        if match.group('type') == '%':
+            continue
+        if match.group('name') is not None:
+            printf_named.add(match.group('name'))
+        else:
+            printf_positional.append(match.group('type'))
+
+    brace = {
+        match.group('field').split('!')[0].split(':')[0]
+        for match in BRACE_PLACEHOLDER.finditer(text)
+        if match.group('field') is not None
+    }
+
+    tags = Counter(
+        (match.group('closing') or '') + match.group('tag').lower()
+        for match in HTML_TAG.finditer(text)
+    )
+
+    return Placeholders(
+        frozenset(printf_named),
+        tuple(printf_positional),
+        frozenset(brace),
+        tuple(sorted(tags.items())),
+    )
+
+
+# msgids are shared by every locale and every batch, so their placeholders are
+# extracted only once while translations are always extracted on the fly
+extract_source_placeholders = lru_cache(maxsize=16384)(extract_placeholders)
+
+
+def get_format_flags(entry: POEntry) -> List[str]:
+    return [flag for flag in entry.flags if flag in FORMAT_FLAGS]
+
+
+def get_unbalanced_tags(text: str) -> List[str]:
+    """Return the tags of a text that are not properly opened and closed"""
+    stack = []
+    unbalanced = []
+
+    for match in HTML_TAG.finditer(text):
+        tag = match.group('tag').lower()
+        if match.group('void') or tag in VOID_TAGS:
+            continue
+        if not match.group('closing'):
+            stack.append(tag)
+        elif stack and stack[-1] == tag:
+            stack.pop()
+        else:
+            unbalanced.append(f'</{tag}>')
+
+    return unbalanced + [f'<{tag}>' for tag in stack]
+
+
+def compare_placeholders(
+    source: Placeholders, translation: Placeholders, flags: Set[str], is_plural: bool
+) -> List[str]:
+    problems = []
+
+    if 'python-format' in flags:
+        if is_plural:
+            unknown = translation.printf_named - source.printf_named
+            if unknown:
+                problems.append(f'unknown %-placeholders {sorted(unknown)}')
+        elif source.printf_named != translation.printf_named:
+            problems.append(
+                f'%-placeholders {sorted(translation.printf_named)} do not match '
+                f'{sorted(source.printf_named)}'
+            )
+        positional = translation.printf_positional
+        if not is_plural and source.printf_positional != positional:
+            problems.append(
+                f'positional %-placeholders {list(positional)} do '
+                f'not match {list(source.printf_positional)}'
+            )
+
+    if 'python-brace-format' in flags:
+        if is_plural:
+            unknown = translation.brace - source.brace
+            if unknown:
+                problems.append(f'unknown {{}}-placeholders {sorted(unknown)}')
+        elif source.brace != translation.brace:
+            problems.append(
+                f'{{}}-placeholders {sorted(translation.brace)} do not match '
+                f'{sorted(source.brace)}'
+            )
+
+    if source.tags != translation.tags:
+        problems.append('HTML tags do not match the original string')
+
+    return problems
+
+
+def validate_translation(entry: POEntry, translated_entry: POEntry) -> List[str]:
+    """Check an incoming translation against the msgid and flags of the entry
+    it will be merged into. Returns a list of problems, empty when valid"""
+    # Flags are not kept in any particular order by translation tools
+    flags = set(get_format_flags(entry))
+    translated_flags = set(get_format_flags(translated_entry))
+    problems = []
+
+    if flags != translated_flags:
+        problems.append(
+            f'format flags {sorted(translated_flags)} do not match {sorted(flags)}'
+        )
+
+    if translated_entry.msgstr_plural:
+        # Plural forms may drop placeholders of the other form (e.g. "one item")
+        # but HTML markup must be the same in every form
+        source = extract_source_placeholders(f'{entry.msgid}\n{entry.msgid_plural}')
+        source = source._replace(tags=extract_source_placeholders(entry.msgid).tags)
+        translations = [
+            text for _, text in sorted(translated_entry.msgstr_plural.items())
+        ]
+        is_plural = True
+    else:
+        source = extract_source_placeholders(entry.msgid)
+        translations = [translated_entry.msgstr]
+        is_plural = False
+
+    for text in filter(None, translations):
+        problems += compare_placeholders(
+            source, extract_placeholders(text), flags, is_plural
+        )
+        unbalanced = get_unbalanced_tags(text)
+        if unbalanced:
+            problems.append(f'unbalanced HTML tags {unbalanced}')
+
+    return problems
@@ -4,13 +4,18 @@ from django.core.management.base import BaseCommand
 
 from .._helpers import (
     ALL_APPS,
+    ProjectIndex,
     get_po_file_path,
     get_po_file_path_general_locale,
     get_po_project_comment,
     get_supported_locale,
-    has_project,
+    remove_project,
     safe_read_pofile,
 )
+from .._exchange import EXCHANGE_FORMATS, get_exchange_path
+from .._journal import RunJournal, add_journal_arguments
+from .._patch import patch_pofile
+from .._shards import get_catalog_paths, is_sharded
 
 
 class Command(BaseCommand):
@@ -46,51 +51,73 @@ class Command(BaseCommand):
             help='Po Project name, e.g. jdoe_20210101',
         )
 
+        add_journal_arguments(parser)
+
     def handle(self, *args, **options):
         self.project_name = options.get('project_name')
         self.locale = get_supported_locale(options.get('locale'))
         self.dry_run = options.get('dry_run')
         self.project_comment = get_po_project_comment(self.project_name)
+        self.journal = RunJournal(
+            'cleanmessages', [self.locale, self.project_name], enabled=not self.dry_run
+        )
+
+        if options.get('rollback'):
+            for path in self.journal.rollback():
+                self.stdout.write(self.style.SUCCESS(f'Restored: {path}'))
+            return
+
+        self.journal.start(resume=options.get('resume'))
 
         for app in ALL_APPS:
             po_file = get_po_file_path(app.path, self.locale)
             self.process_po_file(po_file)
 
             po_project_file = get_po_file_path(app.path, self.locale, self.project_name)
-            self.delete_po_project_file(po_project_file)
+            self.delete_po_project_files(po_project_file)
         self.process_po_file(get_po_file_path_general_locale(self.locale))
-        self.delete_po_project_file(
+        self.delete_po_project_files(
             get_po_file_path_general_locale(self.locale, self.project_name)
         )
 
+        self.journal.finish()
+
     def process_po_file(self, po_file):
-        if po_file.exists():
+        if po_file.exists() or is_sharded(po_file):
             self.stdout.write(self.style.SUCCESS(f'Processing: {po_file}'))
-            count = 0
 
-            po = safe_read_pofile(po_file)
-            for entry in po:
-                if has_project(entry, self.project_comment):
-                    self.remove_project(entry)
-                    count += 1
+            for catalog_path in get_catalog_paths(po_file):
+                self.process_catalog(catalog_path)
+
+    def process_catalog(self, catalog_path):
+        if self.journal.is_completed(catalog_path):
+            self.stdout.write(f'Already processed: {catalog_path}')
+            return
 
-            if not self.dry_run and count:
-                po.save()
-                self.stdout.write(self.style.SUCCESS(f'Removed {count} occurrence(s)'))
+        po = safe_read_pofile(catalog_path)
+        changed_entries = ProjectIndex(po).get_entries(self.project_comment)
+        for entry in changed_entries:
+            remove_project(entry, self.project_comment)
+
+        if not self.dry_run and changed_entries:
+            self.journal.plan(catalog_path, 'write')
+            patch_pofile(po, changed_entries)
+            self.stdout.write(
+                self.style.SUCCESS(f'Removed {len(changed_entries)} occurrence(s)')
+            )
+
+        self.journal.complete(catalog_path)
+
+    def delete_po_project_files(self, po_project_file):
+        """Delete the project file written by extractmessages in every format"""
+        for exchange_format in EXCHANGE_FORMATS:
+            self.delete_po_project_file(
+                get_exchange_path(po_project_file, exchange_format)
+            )
 
     def delete_po_project_file(self, po_file):
         if not self.dry_run and po_file.exists():
+            self.journal.plan(po_file, 'delete')
             po_file.unlink()
+            self.journal.complete(po_file)
             self.stdout.write(self.style.SUCCESS(f'Removed project file: {po_file}'))
-
-    def remove_project(self, entry):
-        """Remove all occurrences of project name from comment"""
-        comments = entry.comment.splitlines()
-        updated_comments = list(filter(self.project_comment.__ne__, comments))
-
-        if len(updated_comments):
-            entry.comment = '\n'.join(updated_comments).strip()
-        else:
-            entry.comment = None
-
-        return entry
@@ -0,0 +1,44 @@
+from os import path
+
+from django.core.management.commands import compilemessages
+from django.utils.translation import to_locale
+
+from .._helpers import (
+    ALL_APPS,
+    SUPPORTED_LANGUAGES,
+    get_po_file_path,
+    get_po_file_path_general_locale,
+)
+from .._shards import SHARDS_DIR_NAME, assemble_catalog, is_sharded
+
+
+class Command(compilemessages.Command):
+    '''Assembles the django.po file of sharded catalogs before compiling them'''
+
+    def handle(self, **options):
+        locales = [
+            locale
+            for locale in SUPPORTED_LANGUAGES
+            if not options["locale"] or to_locale(locale) in options["locale"]
+        ]
+
+        for locale in locales:
+            po_paths = [get_po_file_path(app.path, locale) for app in ALL_APPS]
+            po_paths.append(get_po_file_path_general_locale(locale))
+
+            for po_path in filter(is_sharded, po_paths):
+                count = assemble_catalog(po_path)
+                self.stdout.write(f"Assembled {count} entries into [{po_path}]")
+
+        super().handle(**options)
+
+    def compile_messages(self, locations):
+        # Shards are only sources of the assembled django.po file
+        locations = [
+            (dirpath, file_name)
+            for dirpath, file_name in locations
+            if path.basename(dirpath) != SHARDS_DIR_NAME
+        ]
+
+        if locations:
+            super().compile_messages(locations)
@@ -0,0 +1,94 @@
+import argparse
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .._bundle import BundleFile, write_bundle
+from .._helpers import (
+    ALL_APPS,
+    SUPPORTED_LANGUAGES,
+    get_po_file_path,
+    get_po_file_path_general_locale,
+    get_supported_locale,
+)
+
+
+class Command(BaseCommand):
+    """Bundle every po project file of a project into a single archive"""
+
+    help = (
+        'This management command writes all the po project files created with '
+        'extractmessages for a project, in every app and locale, into one archive. '
+        'Usage: python manage.py exportmessages -p jdoe_20220101'
+    )
+
+    def add_arguments(self, parser):
+        parser.formatter_class = argparse.ArgumentDefaultsHelpFormatter
+
+        parser.add_argument(
+            '-l',
+            '--locale',
+            action='append',
+            default=[],
+            help=(
+                'Export only po project files in a specific locale, e.g. de. '
+                'Can be used multiple times, all supported locales by default'
+            ),
+        )
+
+        parser.add_argument(
+            '-p',
+            '--project-name',
+            required=True,
+            help='Po Project name, e.g. jdoe_20220101',
+        )
+
+        parser.add_argument(
+            '-o',
+            '--output',
+            required=False,
+            help='Archive path, by default po_project_<project name>.tar.gz',
+        )
+
+    def handle(self, *args, **options):
+        self.project_name = options.get('project_name')
+        locales = list(map(get_supported_locale, options.get('locale')))
+        output = Path(options.get('output') or f'po_project_{self.project_name}.tar.gz')
+
+        files = self.find_project_files(locales or SUPPORTED_LANGUAGES)
+        if not files:
+            raise CommandError(
+                f'No po project files found for [{self.project_name}], '
+                'please run extractmessages first'
+            )
+
+        manifest = write_bundle(output, self.project_name, files)
+
+        for file_info in manifest['files']:
+            self.stdout.write(f" • {file_info['name']}: {file_info['entries']} entries")
+        self.stdout.write(
+            self.style.SUCCESS(f'Exported {len(files)} po project file(s) to {output}')
+        )
+
+    def find_project_files(self, locales):
+        files = []
+
+        for locale in locales:
+            for app in ALL_APPS:
+                files.append(
+                    BundleFile(
+                        app.label,
+                        locale,
+                        get_po_file_path(app.path, locale, self.project_name),
+                    )
+                )
+            files.append(
+                BundleFile(
+                    'locale',
+                    locale,
+                    get_po_file_path_general_locale(locale, self.project_name),
+                )
+            )
+
+        return [bundle_file for bundle_file in files if bundle_file.path.exists()]
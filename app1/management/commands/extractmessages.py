@@ -1,18 +1,23 @@
 import argparse
 
+from itertools import chain
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from polib import POFile
 
+from .._exchange import EXCHANGE_FORMATS, get_exchange_path, write_project_entries
 from .._helpers import (
     ALL_APPS,
+    ProjectIndex,
     get_po_file_path,
     get_po_file_path_general_locale,
     get_po_project_comment,
     get_supported_locale,
-    has_project,
     safe_read_pofile,
 )
+from .._shards import get_catalog_paths, is_sharded
 
 
 class Command(BaseCommand):
@@ -34,6 +39,16 @@ class Command(BaseCommand):
             help='Force saving when project po file exists',
         )
 
+        parser.add_argument(
+            '--format',
+            choices=EXCHANGE_FORMATS,
+            default='po',
+            help=(
+                'Format of the project file: po, csv, xliff (XLIFF 1.2, written as '
+                '.xlf) or xliff2 (XLIFF 2.0, written as .xliff2.xlf)'
+            ),
+        )
+
         parser.add_argument(
             '-l',
             '--locale',
@@ -54,17 +69,24 @@ class Command(BaseCommand):
         self.force = options.get('force')
         self.project_comment = get_po_project_comment(self.project_name)
 
+        self.format = options.get('format')
+
         for app in ALL_APPS:
             po_file = get_po_file_path(app.path, self.locale)
             po_project_file = get_po_file_path(app.path, self.locale, self.project_name)
-            self.process_po_file(po_file, po_project_file)
+            self.process_po_file(
+                po_file, get_exchange_path(po_project_file, self.format)
+            )
         self.process_po_file(
             get_po_file_path_general_locale(self.locale),
-            get_po_file_path_general_locale(self.locale, self.project_name),
+            get_exchange_path(
+                get_po_file_path_general_locale(self.locale, self.project_name),
+                self.format,
+            ),
         )
 
     def process_po_file(self, po_file, project_po_file):
-        if po_file.exists():
+        if po_file.exists() or is_sharded(po_file):
             self.stdout.write(self.style.SUCCESS(f'Processing: {po_file}'))
             if project_po_file.exists() and not self.force:
                 self.stdout.write(
@@ -73,13 +95,16 @@ class Command(BaseCommand):
                 )
                 return False
 
-            po = safe_read_pofile(po_file)
+            if self.format != 'po':
+                return self.write_exchange_file(po_file, project_po_file)
+
             project_po = POFile()
-            project_po.metadata = po.metadata
 
-            for entry in po:
-                if has_project(entry, self.project_comment):
-                    project_po.append(entry)
+            for catalog_path in get_catalog_paths(po_file):
+                po = safe_read_pofile(catalog_path)
+                project_po.metadata = po.metadata
+
+                project_po.extend(ProjectIndex(po).get_entries(self.project_comment))
 
             if len(project_po):
                 project_po.save(project_po_file)
@@ -88,3 +113,26 @@ class Command(BaseCommand):
                         f'Wrote {len(project_po)} entries to {project_po_file}'
                     )
                 )
+
+    def write_exchange_file(self, po_file, project_file):
+        """Write the tagged entries as CSV or XLIFF while the catalog is read,
+        without building a project po file in memory"""
+        entries = self.get_project_entries(po_file)
+        first_entry = next(entries, None)
+
+        if first_entry is not None:
+            count = write_project_entries(
+                chain([first_entry], entries),
+                project_file,
+                self.format,
+                settings.LANGUAGE_CODE,
+                self.locale,
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'Wrote {count} entries to {project_file}')
+            )
+
+    def get_project_entries(self, po_file):
+        for catalog_path in get_catalog_paths(po_file):
+            po = safe_read_pofile(catalog_path)
+            yield from ProjectIndex(po).get_entries(self.project_comment)
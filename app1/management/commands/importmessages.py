@@ -0,0 +1,118 @@
+from collections import defaultdict
+
+from django.core.management.base import CommandError
+
+from . import mergemessages
+from .._bundle import read_bundle
+from .._helpers import (
+    ALL_APPS,
+    get_po_file_path,
+    get_po_file_path_general_locale,
+    get_supported_locale,
+)
+from .._journal import RunJournal, add_journal_arguments
+from .._shards import is_sharded
+
+
+class Command(mergemessages.Command):
+    '''Merge back every po project file of an archive created with exportmessages'''
+
+    help = (
+        'This management command merges back all the translated po project files '
+        'contained in an archive created with exportmessages, in a single pass. '
+        'Usage: python manage.py importmessages po_project_jdoe_20220101.tar.gz'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'bundle',
+            help='The archive created with exportmessages',
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            required=False,
+            help=(
+                'Run the management command without writing any changes to the django.po'
+                ' files'
+            ),
+        )
+
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            default=False,
+            required=False,
+            help=(
+                'Abort without writing any changes when a translation has broken '
+                'placeholders or HTML tags. By default these entries are skipped'
+            ),
+        )
+
+        add_journal_arguments(parser)
+
+    def handle(self, *args, **options):
+        self.is_dry = options.get('dry_run')
+        self.is_strict = options.get('strict')
+        self.affected_pages_templates = []
+        self.invalid_entries = []
+        self.changed_entries = defaultdict(list)
+        self.journal = RunJournal(
+            'importmessages', [options.get('bundle')], enabled=not self.is_dry
+        )
+
+        if options.get('rollback'):
+            for restored_path in self.journal.rollback():
+                self.stdout.write(self.style.SUCCESS(f'Restored: {restored_path}'))
+            return
+
+        self.journal.start(resume=options.get('resume'))
+
+        # Nothing is written until every file of the archive has been verified.
+        # A manifest has a single project file per app and locale, so each
+        # django.po file (or its shards) is read only once
+        django_pos = {}
+
+        for manifest, file_info, project_po in read_bundle(options.get('bundle')):
+            self.project = manifest['project']
+            po_file = self.get_django_po_path(file_info)
+
+            catalogs = self.read_django_pos(po_file, project_po)
+            django_pos[po_file] = catalogs
+
+            self.stdout.write(f"Importing {file_info['name']} into {po_file}...")
+            self.merge_project_entries(catalogs, project_po)
+
+        self.check_invalid_entries()
+
+        if self.is_dry:
+            self.stdout.write(
+                'Dry-run complete. No changes were written to the django.po files'
+            )
+            return
+
+        for po_file, catalogs in django_pos.items():
+            self.stdout.write(f'Writing changes to {po_file}...')
+            for django_po in catalogs:
+                self.save_django_po(django_po)
+
+        self.journal.finish()
+        self.stdout.write(self.style.SUCCESS('Import successfull! 🎉'))
+
+    def get_django_po_path(self, file_info):
+        locale = get_supported_locale(file_info['locale'])
+
+        if file_info['app'] == 'locale':
+            po_file = get_po_file_path_general_locale(locale)
+        else:
+            app = next((app for app in ALL_APPS if app.label == file_info['app']), None)
+            if app is None:
+                raise CommandError(f"The app '{file_info['app']}' does not exist!")
+            po_file = get_po_file_path(app.path, locale)
+
+        if not (po_file.exists() or is_sharded(po_file)):
+            raise CommandError(f'Not found: {po_file}')
+
+        return po_file
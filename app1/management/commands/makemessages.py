@@ -8,10 +8,15 @@ from polib import POFile
 from .._helpers import (
     ALL_APPS,
     SUPPORTED_LANGUAGES,
+    add_project,
+    get_entry_projects,
     get_po_file_path,
+    get_po_file_path_general_locale,
+    get_po_project_comment,
     get_supported_locale,
     safe_read_pofile,
 )
+from .._shards import assemble_catalog, is_sharded, read_layout, split_catalog
 
 
 class Command(makemessages.Command):
@@ -45,12 +50,14 @@ class Command(makemessages.Command):
 
         options["locale"] = self.locales
 
+        sharded = self.assemble_sharded_catalogs()
         backup = self.backup_comments()
 
         super().handle(*args, **options)
 
         self.restore_comments(backup)
         self.post_process_po_files()
+        self.split_sharded_catalogs(sharded)
 
         self.stdout.write(self.style.SUCCESS("All Done! 🎉"))
 
@@ -107,22 +114,49 @@ class Command(makemessages.Command):
                     )
                 )
 
+    def get_catalog_po_paths(self):
+        """Return the django.po files of every app and of the project locale
+        directory, which can all be sharded by shardmessages"""
+        po_paths = [
+            get_po_file_path(app.path, locale)
+            for app in ALL_APPS
+            for locale in self.locales
+        ]
+        po_paths.extend(map(get_po_file_path_general_locale, self.locales))
+        return po_paths
+
+    def assemble_sharded_catalogs(self):
+        """Sharded catalogs need a django.po file so gettext can merge the new
+        strings into it, returns their layouts to split them again afterwards"""
+        sharded = {}
+
+        for po_path in self.get_catalog_po_paths():
+            if is_sharded(po_path):
+                sharded[po_path] = read_layout(po_path)
+                assemble_catalog(po_path)
+
+        return sharded
+
+    def split_sharded_catalogs(self, sharded):
+        for po_path, layout in sharded.items():
+            count = split_catalog(po_path, layout['mode'], layout['buckets'])
+            self.stdout.write(f"Split [{po_path}] into {count} shard(s)")
+
     def backup_comments(self):
         backup = {}
 
-        for app in ALL_APPS:
-            for locale in self.locales:
-                po_path = get_po_file_path(app.path, locale)
-
-                if path.exists(po_path):
-                    django_po = safe_read_pofile(po_path)
-                    temp_po = POFile()
+        # gettext rewrites the extracted comments of the project locale
+        # directory too, sharded or not
+        for po_path in self.get_catalog_po_paths():
+            if path.exists(po_path):
+                django_po = safe_read_pofile(po_path)
+                temp_po = POFile()
 
-                    for entry in django_po:
-                        if entry.comment:
-                            temp_po.append(entry)
+                for entry in django_po:
+                    if get_entry_projects(entry):
+                        temp_po.append(entry)
 
-                    backup[po_path] = temp_po
+                backup[po_path] = temp_po
 
         self.stdout.write('PO project comments backed up')
         return backup
@@ -135,7 +169,10 @@ class Command(makemessages.Command):
                 po_entry = django_po.find(backup_entry.msgid)
 
                 if po_entry:
-                    po_entry.comment = backup_entry.comment
+                    # Only the project tags are restored, the other extracted
+                    # comments come from the source code
+                    for project_name in get_entry_projects(backup_entry):
+                        add_project(po_entry, get_po_project_comment(project_name))
 
             django_po.save()
 
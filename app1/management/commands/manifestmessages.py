@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from .._manifest import MANIFEST_PATH, build_manifest, write_manifest
+
+
+class Command(BaseCommand):
+    """Write the apps and languages of the project for the standalone CLI"""
+
+    help = (
+        'This management command writes the locale paths of every app and the '
+        'supported languages to a manifest, so pocli.py can run the PO workflow '
+        'commands without setting up Django. Run it again after adding apps or '
+        'languages. Usage: python manage.py manifestmessages'
+    )
+
+    def handle(self, *args, **options):
+        manifest = build_manifest()
+        write_manifest(manifest, MANIFEST_PATH)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(manifest['apps'])} apps and "
+                f"{len(manifest['languages'])} languages to {MANIFEST_PATH}"
+            )
+        )
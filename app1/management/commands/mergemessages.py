@@ -1,16 +1,21 @@
-import csv
-
+from collections import defaultdict
 from os import path
 
 from django.core.management.base import BaseCommand, CommandError
 from django.utils.translation import to_locale
 
+from .._exchange import read_project_entries
 from .._helpers import (
+    ProjectIndex,
     get_po_project_comment,
     get_supported_locale,
     has_project,
     safe_read_pofile,
 )
+from .._journal import RunJournal, add_journal_arguments
+from .._patch import patch_pofile
+from .._shards import get_catalog_paths_for_entries, is_sharded
+from .._validation import validate_translation
 
 
 class Command(BaseCommand):
@@ -46,7 +51,10 @@ class Command(BaseCommand):
 
         parser.add_argument(
             'file',
-            help='The input file to import the PO project',
+            help=(
+                'The input file to import the PO project, a .po, .csv or XLIFF '
+                '(.xlf, .xliff) file'
+            ),
         )
 
         parser.add_argument(
@@ -60,12 +68,26 @@ class Command(BaseCommand):
             ),
         )
 
+        add_journal_arguments(parser)
+
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            default=False,
+            required=False,
+            help=(
+                'Abort without writing any changes when a translation has broken '
+                'placeholders or HTML tags. By default these entries are skipped'
+            ),
+        )
+
     def handle(self, *args, **options):
         self.app = options.get('app')
         self.locale = get_supported_locale(options.get('locale'))
         self.project = options.get('project')
         self.file = options.get('file')
         self.is_dry = options.get('dry_run')
+        self.is_strict = options.get('strict')
         self.locale_name = to_locale(self.locale)
         self.django_po_path = (
             f"{self.app}/locale/{self.locale_name}/LC_MESSAGES/django.po"
@@ -76,6 +98,18 @@ class Command(BaseCommand):
 
         self.affected_pages_templates = []
         self.affected_pages = []
+        self.invalid_entries = []
+        self.changed_entries = defaultdict(list)
+        self.journal = RunJournal(
+            'mergemessages',
+            [self.app, self.locale, self.project, self.file],
+            enabled=not self.is_dry,
+        )
+
+        if options.get('rollback'):
+            for restored_path in self.journal.rollback():
+                self.stdout.write(self.style.SUCCESS(f'Restored: {restored_path}'))
+            return
 
         self.validate_folder_locale()
         self.validate_app()
@@ -84,7 +118,9 @@ class Command(BaseCommand):
         self.validate_file()
 
         self.stdout.write("Importing PO project...")
+        self.journal.start(resume=options.get('resume'))
         self.write_project_to_django_po()
+        self.journal.finish()
 
         self.stdout.write(self.style.SUCCESS('Import successfull! 🎉'))
 
@@ -107,7 +143,7 @@ class Command(BaseCommand):
             )
 
     def validate_django_po(self):
-        if not path.exists(self.django_po_path):
+        if not (path.exists(self.django_po_path) or is_sharded(self.django_po_path)):
             raise CommandError(
                 f"The app '{self.app}' does not contain a django.po translation file"
             )
@@ -117,35 +153,109 @@ class Command(BaseCommand):
             raise CommandError(f"Unable to find the specified file [{self.file}]")
 
     def write_project_to_django_po(self):
+        project_po = read_project_entries(self.file)
+        if is_sharded(self.django_po_path):
+            # The entries are needed twice, to find their shards and to merge them
+            project_po = list(project_po)
+        django_pos = self.read_django_pos(self.django_po_path, project_po)
+        self.merge_project_entries(django_pos, project_po)
+        self.check_invalid_entries()
+
+        if not self.is_dry:
+            self.stdout.write('Writing changes to django.po file...')
+            for django_po in django_pos:
+                self.save_django_po(django_po)
+        else:
+            self.stdout.write(
+                'Dry-run complete. No changes were written to the django.po file'
+            )
+
+    def read_django_pos(self, django_po_path, project_po):
+        """Read the django.po file, or only the shards holding the entries of the
+        project when the catalog is sharded. Files already merged by an
+        interrupted run are skipped when resuming"""
+        django_pos = []
+
+        for catalog_path in get_catalog_paths_for_entries(django_po_path, project_po):
+            if self.journal.is_completed(catalog_path):
+                self.stdout.write(f'Already merged: {catalog_path}')
+            else:
+                django_pos.append(safe_read_pofile(catalog_path))
+
+        return django_pos
+
+    def save_django_po(self, django_po):
+        self.journal.plan(django_po.fpath, 'write')
+        patch_pofile(django_po, self.changed_entries[django_po.fpath])
+        self.journal.complete(django_po.fpath)
+
+    def merge_project_entries(self, django_pos, project_po):
         tag = get_po_project_comment(self.project)
-        django_po = safe_read_pofile(self.django_po_path)
 
-        for project_entry in safe_read_pofile(self.file):
-            if tag not in project_entry.comment:
+        # The tagged entries of every catalog by context and msgid, so each
+        # project entry is found without scanning the catalogs again
+        tagged_entries = defaultdict(list)
+        for django_po in django_pos:
+            for entry in ProjectIndex(django_po).get_entries(tag):
+                tagged_entries[entry.msgctxt, entry.msgid].append((django_po, entry))
+
+        for project_entry in project_po:
+            if not has_project(project_entry, tag):
                 self.show_warning(
                     f"Entry [{project_entry.msgid}] is not part of this project, so it"
                     " will be ignored!"
                 )
             else:
-                for entry in django_po:
-                    matches_id = entry.msgid == project_entry.msgid
+                key = (project_entry.msgctxt, project_entry.msgid)
+                if key not in tagged_entries:
+                    context = (
+                        f' with context [{project_entry.msgctxt}]'
+                        if project_entry.msgctxt
+                        else ''
+                    )
+                    self.show_warning(
+                        f"Entry [{project_entry.msgid}]{context} does not match any"
+                        " tagged entry, so it will be ignored!"
+                    )
+                for django_po, entry in tagged_entries.get(key, []):
+                    self.merge_project_entry(django_po, entry, project_entry)
 
-                    if has_project(entry, tag) and matches_id:
-                        if entry.msgstr:
-                            self.show_warning(
-                                f"Overwriting current translation of [{entry.msgid}]"
-                            )
-                        self.get_entry_ocurrences(entry)
-                        entry.msgstr = project_entry.msgstr
+    def merge_project_entry(self, django_po, entry, project_entry):
+        if not self.is_valid_translation(entry, project_entry):
+            return
+        if entry.msgstr:
+            self.show_warning(f"Overwriting current translation of [{entry.msgid}]")
+        self.get_entry_ocurrences(entry)
+        entry.msgstr = project_entry.msgstr
+        if project_entry.msgstr_plural:
+            entry.msgstr_plural = dict(project_entry.msgstr_plural)
+        self.changed_entries[django_po.fpath].append(entry)
 
-        if not self.is_dry:
-            self.stdout.write('Writing changes to django.po file...')
-            django_po.save()
-        else:
-            self.stdout.write(
-                'Dry-run complete. No changes were written to the django.po file'
+    def is_valid_translation(self, entry, project_entry):
+        problems = validate_translation(entry, project_entry)
+
+        if problems:
+            self.invalid_entries.append(entry.msgid)
+            self.show_warning(
+                f"Invalid translation of [{entry.msgid}]: {'; '.join(problems)}"
+            )
+
+        return not problems
+
+    def check_invalid_entries(self):
+        if not self.invalid_entries:
+            return
+
+        if self.is_strict:
+            raise CommandError(
+                f"{len(self.invalid_entries)} invalid translation(s) found, "
+                "no changes were written to the django.po file"
             )
 
+        self.show_warning(
+            f"{len(self.invalid_entries)} invalid translation(s) were skipped"
+        )
+
     def show_warning(self, message):
         self.stdout.write(self.style.WARNING(f"⚠️  WARNING: {message}"))
 
@@ -0,0 +1,112 @@
+import argparse
+
+from django.core.management.base import BaseCommand
+
+from .._helpers import (
+    ALL_APPS,
+    SUPPORTED_LANGUAGES,
+    get_po_file_path,
+    get_po_file_path_general_locale,
+    get_supported_locale,
+    positive_int,
+)
+from .._shards import (
+    DEFAULT_BUCKETS,
+    SHARD_MODES,
+    assemble_catalog,
+    is_sharded,
+    split_catalog,
+    unshard_catalog,
+)
+
+
+class Command(BaseCommand):
+    """Split django.po files into small shards, or assemble them back"""
+
+    help = (
+        'This management command splits every django.po file into shards, one per '
+        'template or per hash bucket, so the other commands only read and write the '
+        'shards they need. The django.po files are assembled by compilemessages. '
+        'Usage: python manage.py shardmessages -l de --mode template'
+    )
+
+    def add_arguments(self, parser):
+        parser.formatter_class = argparse.ArgumentDefaultsHelpFormatter
+
+        parser.add_argument(
+            '-l',
+            '--locale',
+            action='append',
+            default=[],
+            help=(
+                'Shard only po files in a specific locale, e.g. de. '
+                'Can be used multiple times, all supported locales by default'
+            ),
+        )
+
+        parser.add_argument(
+            '--mode',
+            choices=SHARD_MODES,
+            default='template',
+            help=(
+                'Group entries by the template of their first occurrence, or by a hash '
+                'of the msgid into a fixed number of buckets'
+            ),
+        )
+
+        parser.add_argument(
+            '--buckets',
+            type=positive_int,
+            default=DEFAULT_BUCKETS,
+            help='Number of shards when using --mode hash',
+        )
+
+        parser.add_argument(
+            '--assemble',
+            action='store_true',
+            default=False,
+            help='Only write the django.po file of sharded catalogs, keep the shards',
+        )
+
+        parser.add_argument(
+            '--unshard',
+            action='store_true',
+            default=False,
+            help='Assemble the django.po file of sharded catalogs and remove the shards',
+        )
+
+    def handle(self, *args, **options):
+        self.mode = options.get('mode')
+        self.buckets = options.get('buckets')
+        self.assemble = options.get('assemble')
+        self.unshard = options.get('unshard')
+        locales = list(map(get_supported_locale, options.get('locale')))
+
+        for locale in locales or SUPPORTED_LANGUAGES:
+            for app in ALL_APPS:
+                self.process_po_file(get_po_file_path(app.path, locale))
+            self.process_po_file(get_po_file_path_general_locale(locale))
+
+    def process_po_file(self, po_file):
+        if is_sharded(po_file):
+            if self.unshard:
+                count = unshard_catalog(po_file)
+                self.stdout.write(
+                    self.style.SUCCESS(f'Unsharded {count} entries into {po_file}')
+                )
+            elif self.assemble:
+                count = assemble_catalog(po_file)
+                self.stdout.write(
+                    self.style.SUCCESS(f'Assembled {count} entries into {po_file}')
+                )
+            else:
+                # Re-shard from an up to date django.po with the new layout
+                assemble_catalog(po_file)
+                self.split(po_file)
+
+        elif po_file.exists() and not (self.assemble or self.unshard):
+            self.split(po_file)
+
+    def split(self, po_file):
+        count = split_catalog(po_file, self.mode, self.buckets)
+        self.stdout.write(self.style.SUCCESS(f'Split {po_file} into {count} shard(s)'))
@@ -0,0 +1,150 @@
+import argparse
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .._helpers import (
+    ALL_APPS,
+    SUPPORTED_LANGUAGES,
+    get_po_file_path,
+    get_po_file_path_general_locale,
+    get_supported_locale,
+)
+from .._shards import get_catalog_paths
+from .._summary import SummaryCache, merge_summaries
+
+
+class Command(BaseCommand):
+    """Report translation coverage and project tags of every django.po file"""
+
+    help = (
+        'This management command reports translated, untranslated, fuzzy, obsolete '
+        'and tagged entries per app and locale. '
+        'Usage: python manage.py statusmessages -l de --format json'
+    )
+
+    COLUMNS = (
+        ('app', 'App'),
+        ('locale', 'Locale'),
+        ('total', 'Total'),
+        ('translated', 'Translated'),
+        ('untranslated', 'Untranslated'),
+        ('fuzzy', 'Fuzzy'),
+        ('obsolete', 'Obsolete'),
+        ('words', 'Words'),
+        ('untranslated_words', 'Missing words'),
+        ('coverage', 'Coverage %'),
+    )
+
+    def add_arguments(self, parser):
+        parser.formatter_class = argparse.ArgumentDefaultsHelpFormatter
+
+        parser.add_argument(
+            '-l',
+            '--locale',
+            action='append',
+            default=[],
+            help=(
+                'Report only po files in a specific locale, e.g. de. '
+                'Can be used multiple times, all supported locales by default'
+            ),
+        )
+
+        parser.add_argument(
+            '--format',
+            choices=['table', 'json'],
+            default='table',
+            help='Output format of the report',
+        )
+
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            default=False,
+            help='Parse every po file instead of reusing the cached summaries',
+        )
+
+        parser.add_argument(
+            '--fail-under',
+            type=float,
+            required=False,
+            help=(
+                'Exit with an error when the coverage of any po file is below the '
+                'given percentage, e.g. 95'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.locales = list(map(get_supported_locale, options.get('locale')))
+        self.cache = SummaryCache(enabled=not options.get('no_cache'))
+
+        rows = self.collect_rows(self.locales or SUPPORTED_LANGUAGES)
+        self.cache.save()
+
+        if options.get('format') == 'json':
+            self.stdout.write(json.dumps(rows, indent=2))
+        else:
+            self.write_table(rows)
+
+        self.check_coverage(rows, options.get('fail_under'))
+
+    def collect_rows(self, locales):
+        rows = []
+
+        for locale in locales:
+            for app in ALL_APPS:
+                po_file = get_po_file_path(app.path, locale)
+                self.add_row(rows, app.label, locale, po_file)
+            self.add_row(
+                rows, 'locale', locale, get_po_file_path_general_locale(locale)
+            )
+
+        return rows
+
+    def add_row(self, rows, app_label, locale, po_file):
+        catalog_paths = get_catalog_paths(po_file)
+        if not catalog_paths:
+            return
+
+        summary = merge_summaries(map(self.cache.get_summary, catalog_paths))
+        total = summary['total']
+        coverage = 100 * summary['translated'] / total if total else 100.0
+
+        rows.append(
+            {
+                'app': app_label,
+                'locale': locale,
+                'path': str(po_file),
+                **summary,
+                'coverage': round(coverage, 2),
+            }
+        )
+
+    def write_table(self, rows):
+        table = [[label for _, label in self.COLUMNS]]
+        table += [[str(row[key]) for key, _ in self.COLUMNS] for row in rows]
+        widths = [max(map(len, column)) for column in zip(*table)]
+
+        for line in table:
+            row = '  '.join(cell.ljust(width) for cell, width in zip(line, widths))
+            self.stdout.write(row.rstrip())
+
+        projects = [row for row in rows if row['projects']]
+        if projects:
+            self.stdout.write('')
+            self.stdout.write('Tagged entries per project:')
+
+        for row in projects:
+            for project, count in sorted(row['projects'].items()):
+                self.stdout.write(
+                    f" • [{row['app']}] [{row['locale']}] {project}: {count}"
+                )
+
+    def check_coverage(self, rows, fail_under):
+        if fail_under is None:
+            return
+
+        failing = [row for row in rows if row['coverage'] < fail_under]
+        if failing:
+            paths = ', '.join(f"{row['path']} ({row['coverage']}%)" for row in failing)
+            raise CommandError(f'Coverage below {fail_under}%: {paths}')
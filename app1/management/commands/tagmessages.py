@@ -1,17 +1,28 @@
 import argparse
+import heapq
+import subprocess
 import time
 
+from os import path
+
 from django.core.management.base import BaseCommand, CommandError
 
 from .._helpers import (
     ALL_APPS,
     add_project,
+    get_entry_projects,
     get_po_file_path,
     get_po_file_path_general_locale,
     get_po_project_comment,
     get_supported_locale,
+    positive_int,
     safe_read_pofile,
 )
+from .._journal import RunJournal, add_journal_arguments
+from .._partitions import Partitioner
+from .._patch import patch_pofile
+from .._shards import get_catalog_paths, is_sharded
+from .._traffic import get_traffic_dir, get_traffic_key, read_traffic
 
 
 class Command(BaseCommand):
@@ -52,6 +63,16 @@ class Command(BaseCommand):
             ),
         )
 
+        parser.add_argument(
+            '--since',
+            required=False,
+            help=(
+                'Tag only untranslated and fuzzy entries of the files changed since a '
+                'git revision, or in a revision range, '
+                'e.g. origin/main or v1.2..release/1.3'
+            ),
+        )
+
         parser.add_argument(
             '-l',
             '--locale',
@@ -63,20 +84,114 @@ class Command(BaseCommand):
             '-p',
             '--project-name',
             required=False,
-            default=self.generate_project_name(),
-            help='Project name to tag po files, e.g. jdoe_20220101',
+            help=(
+                'Project name to tag po files, e.g. jdoe_20220101. Defaults to '
+                'auto_<timestamp>, reused when resuming an interrupted run'
+            ),
+        )
+
+        parser.add_argument(
+            '--partitions',
+            type=positive_int,
+            required=False,
+            help=(
+                'Split the tagged entries into this number of projects balanced by '
+                'word count, named <project-name>_1 to <project-name>_N. Entries of '
+                'the same template are kept in the same project when possible'
+            ),
+        )
+
+        parser.add_argument(
+            '--max-words',
+            type=positive_int,
+            required=False,
+            help=(
+                'Split the tagged entries into as many projects as needed so that '
+                'none has more than this number of words, named <project-name>_1, '
+                '<project-name>_2...'
+            ),
+        )
+
+        parser.add_argument(
+            '--by-traffic',
+            type=positive_int,
+            required=False,
+            metavar='TOP_N',
+            help=(
+                'Tag only the TOP_N untranslated and fuzzy entries that were looked up '
+                'the most, as recorded by MissingTranslationsMiddleware'
+            ),
         )
 
+        add_journal_arguments(parser)
+
     def handle(self, *args, **options):
 
-        self.project_name = options.get('project_name')
         self.dry_run = options.get('dry_run')
         self.locale = get_supported_locale(options.get('locale'))
+        self.any_file_changed = []
+        self.changed_files = None
+        self.partitioner = None
+        self.top_n = options.get('by_traffic')
+        self.hot_keys = None
+        self.journal = RunJournal(
+            'tagmessages',
+            [
+                self.locale,
+                # A generated project name is kept in the journal instead, so the
+                # run can be resumed or rolled back without knowing it
+                options.get('project_name'),
+                options.get('file_name'),
+                options.get('since'),
+                options.get('partitions'),
+                options.get('max_words'),
+                self.top_n,
+            ],
+            enabled=not self.dry_run,
+        )
+
+        if options.get('rollback'):
+            for restored_path in self.journal.rollback():
+                self.stdout.write(self.style.SUCCESS(f'Restored: {restored_path}'))
+            return
+
+        if options.get('file_name') and options.get('since'):
+            raise CommandError('--file-name and --since can not be used together')
+
+        if options.get('partitions') and options.get('max_words'):
+            raise CommandError('--partitions and --max-words can not be used together')
+
+        if options.get('partitions') or options.get('max_words'):
+            self.partitioner = Partitioner(
+                options.get('partitions') or 0, options.get('max_words') or 0
+            )
+
+        if self.top_n:
+            self.traffic = read_traffic(self.locale)
+            if not self.traffic:
+                raise CommandError(
+                    f'No missing translations were recorded for [{self.locale}] in '
+                    f'{get_traffic_dir()}, is MissingTranslationsMiddleware enabled?'
+                )
+
+        if options.get('since'):
+            self.changed_files = self.get_changed_files(options.get('since'))
+            if not self.changed_files:
+                self.stdout.write(f"No files changed since {options.get('since')}")
+                return
+
+        self.journal.start(resume=options.get('resume'))
+        self.project_name = self.journal.state.setdefault(
+            'project_name', options.get('project_name') or self.generate_project_name()
+        )
         self.project_comment = get_po_project_comment(self.project_name)
 
         self.tag_po_files(options.get('file_name'))
+        self.journal.finish()
 
-        if any(self.any_file_changed):
+        if self.partitioner:
+            self.show_partitions()
+        elif any(self.any_file_changed):
             self.stdout.write(
                 self.style.SUCCESS(f'All done, your tag is: {self.project_name}')
             )
@@ -87,48 +202,85 @@ class Command(BaseCommand):
                 self.style.NOTICE("Running in --dry-run mode, files won't be affected")
             )
 
-        if file_name:
-            self.process_by_filename(file_name)
-        else:
-            self.process_all_apps()
+        po_files = self.get_po_files(file_name)
+        process_with_filename = bool(file_name)
+
+        if self.top_n:
+            self.hot_keys = self.get_hot_keys(po_files, process_with_filename)
+
+        for po_file in po_files:
+            self.process_file(po_file, process_with_filename)
+
+    def get_po_files(self, file_name):
+        if not file_name:
+            po_files = [get_po_file_path(app.path, self.locale) for app in ALL_APPS]
+            po_files.append(get_po_file_path_general_locale(self.locale))
+            return po_files
 
-    def process_by_filename(self, file_name):
         app = self.validate_app_in_filename(file_name)
 
         if app:
-            po_file = get_po_file_path(app.path, self.locale)
-            self.process_file(po_file, process_with_filename=True)
-        else:
-            self.stdout.write(
-                self.style.ERROR(
-                    f'{self.app_name} is not a valid app.\n'
-                    'Remember that the filename must start with the app directory'
-                )
+            return [get_po_file_path(app.path, self.locale)]
+
+        self.stdout.write(
+            self.style.ERROR(
+                f'{self.app_name} is not a valid app.\n'
+                'Remember that the filename must start with the app directory'
             )
+        )
+        return []
 
-    def process_all_apps(self):
-        for app in ALL_APPS:
-            po_file = get_po_file_path(app.path, self.locale)
-            self.process_file(po_file)
-        self.process_file(get_po_file_path_general_locale(self.locale))
+    def get_catalog_paths(self, po_file, process_with_filename):
+        # Sharded catalogs only read the shards of the given file names
+        if process_with_filename:
+            file_names = [self.file_name]
+        else:
+            file_names = self.changed_files
+        return get_catalog_paths(po_file, file_names)
+
+    def get_hot_keys(self, po_files, process_with_filename):
+        """Return the keys of the TOP_N entries that would be tagged with the
+        most lookups of a missing translation. Lookups are counted per string,
+        so a string found in several catalogs takes a single place"""
+        hot_keys = set()
+
+        for po_file in po_files:
+            if not (po_file.exists() or is_sharded(po_file)):
+                continue
+            for catalog_path in self.get_catalog_paths(po_file, process_with_filename):
+                po = safe_read_pofile(catalog_path)
+                for entry in self.select_entries(po, process_with_filename):
+                    key = get_traffic_key(entry)
+                    if self.traffic[key]:
+                        hot_keys.add(key)
+
+        return set(
+            heapq.nlargest(
+                self.top_n, hot_keys, key=lambda key: (self.traffic[key], key)
+            )
+        )
 
     def process_file(self, po_file, process_with_filename=False):
-        if po_file.exists():
+        if po_file.exists() or is_sharded(po_file):
             self.stdout.write(self.style.SUCCESS(f'Processing: {po_file}'))
-            po = safe_read_pofile(po_file)
-
-            self.any_file_changed = []
             self.tagged_entries = 0
-            self.is_file_changed = False
 
-            if process_with_filename:
-                self.tag_by_filename(po)
-            else:
-                self.tag_all_untranslated_strings(po)
+            for catalog_path in self.get_catalog_paths(po_file, process_with_filename):
+                if self.journal.is_completed(catalog_path):
+                    self.stdout.write(f'Already processed: {catalog_path}')
+                    continue
+
+                po = safe_read_pofile(catalog_path)
+                self.changed_entries = []
+
+                self.tag_entries(self.select_entries(po, process_with_filename))
 
-            if self.is_file_changed and not self.dry_run:
-                po.save()
-                self.any_file_changed.append(True)
+                if self.changed_entries and not self.dry_run:
+                    self.journal.plan(catalog_path, 'write')
+                    patch_pofile(po, self.changed_entries)
+                    self.any_file_changed.append(True)
+
+                self.journal.complete(catalog_path)
 
             if not self.dry_run:
                 self.stdout.write(
@@ -144,39 +296,117 @@ class Command(BaseCommand):
             if process_with_filename:
                 raise CommandError(f'Not found: {po_file}')
 
-    def tag_by_filename(self, po):
-        for entry in po:
-            f = self.file_name
-            if self.is_tagable(entry) and any(f in file for file, _ in entry.occurrences):
-                self.tag_entry(entry)
+    def select_entries(self, po, process_with_filename):
+        if process_with_filename:
+            entries = self.select_by_filename(po)
+        elif self.changed_files is not None:
+            entries = self.select_by_changed_files(po)
+        else:
+            entries = self.select_all_untranslated_strings(po)
+
+        if self.hot_keys is not None:
+            entries = (
+                entry for entry in entries if get_traffic_key(entry) in self.hot_keys
+            )
 
-    def tag_all_untranslated_strings(self, po):
-        for entry in po:
-            if self.is_tagable(entry):
-                self.tag_entry(entry)
+        return entries
 
-    def tag_entry(self, entry):
+    def select_by_filename(self, po):
+        f = self.file_name
+        return (
+            entry
+            for entry in po
+            if self.is_tagable(entry)
+            and any(f in file for file, _ in entry.occurrences)
+        )
+
+    def select_by_changed_files(self, po):
+        return (
+            entry
+            for entry in po
+            if self.is_tagable(entry)
+            and not self.changed_files.isdisjoint(
+                path.normpath(file) for file, _ in entry.occurrences
+            )
+        )
+
+    def select_all_untranslated_strings(self, po):
+        return (entry for entry in po if self.is_tagable(entry))
+
+    def tag_entries(self, entries):
+        if not self.partitioner:
+            for entry in entries:
+                self.tag_entry(entry, self.project_comment)
+            return
+
+        for entry, partition in self.partitioner.assign(entries):
+            project_name = self.get_partition_name(partition)
+            self.tag_entry(entry, get_po_project_comment(project_name))
+
+    def tag_entry(self, entry, project_comment):
         if self.dry_run:
             self.stdout.write(f'{self.tagged_entries}> {entry.msgid}')
             self.tagged_entries += 1
         else:
-            entry = add_project(entry, self.project_comment)
-            self.is_file_changed = True
+            entry = add_project(entry, project_comment)
+            self.changed_entries.append(entry)
             self.tagged_entries += 1
 
     def is_tagable(self, entry):
         """Check if a specific entry can have a project_name comment. We check
         if it's fuzzy or untranslated, that it's a non obsolete entry and that
-        it does NOT contain a previous project comment"""
+        it does NOT contain a previous project tag. Other extracted comments
+        are kept when it's tagged"""
         if (
             (entry.fuzzy or not entry.translated())
             and not entry.obsolete
-            and not entry.comment
+            and not get_entry_projects(entry)
         ):
             return True
 
         return False
 
+    def get_partition_name(self, partition):
+        return f'{self.project_name}_{partition}'
+
+    def show_partitions(self):
+        summary = self.partitioner.get_summary()
+
+        self.stdout.write(
+            f"{'Project':<30} {'Entries':>8} {'Words':>8} {'Templates':>10}"
+        )
+        for partition, entries, words, templates in summary:
+            self.stdout.write(
+                f'{self.get_partition_name(partition):<30} '
+                f'{entries:>8} {words:>8} {templates:>10}'
+            )
+
+        if any(self.any_file_changed):
+            project_names = ', '.join(
+                self.get_partition_name(partition) for partition, *_ in summary
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'All done, your tags are: {project_names}')
+            )
+
+    def get_changed_files(self, revision):
+        """Return the paths, relative to the current directory, of the files
+        changed since a git revision or in a revision range"""
+        try:
+            result = subprocess.run(
+                ['git', 'diff', '--name-only', '--relative', revision, '--'],
+                capture_output=True,
+                check=True,
+                text=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as error:
+            details = getattr(error, 'stderr', None) or str(error)
+            raise CommandError(
+                f'Unable to get the files changed since [{revision}]: {details.strip()}'
+            )
+
+        return {path.normpath(file) for file in result.stdout.splitlines() if file}
+
     def generate_project_name(self):
         return f'auto_{int(time.time())}'
 
@@ -0,0 +1,278 @@
+import argparse
+import json
+import time
+
+from collections import Counter, OrderedDict, defaultdict
+from pathlib import Path
+
+from django.core.management.base import CommandError
+
+from . import importmessages
+from .._helpers import safe_read_pofile
+from .._patch import patch_pofile
+from .._shards import get_catalog_paths_for_entries
+from .._summary import get_file_fingerprint
+
+DONE_DIR_NAME = 'done'
+FAILED_DIR_NAME = 'failed'
+STATS_FILE_NAME = 'stats.json'
+PROJECT_FILE_PREFIX = 'po_project_'
+
+
+class Command(importmessages.Command):
+    '''Merge back po project files as soon as they are dropped in an inbox'''
+
+    help = (
+        'This management command watches an inbox directory and merges back every '
+        'po project file dropped in it, as <app>/<locale>/po_project_<name>.po, '
+        'the same layout used by exportmessages. Merged files are moved to the done '
+        'directory and files that can not be merged to the failed directory. '
+        'Usage: python manage.py watchmessages path/to/inbox'
+    )
+
+    def add_arguments(self, parser):
+        parser.formatter_class = argparse.ArgumentDefaultsHelpFormatter
+
+        parser.add_argument(
+            'inbox',
+            help='The directory where translated po project files are dropped',
+        )
+
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help=(
+                'Seconds between two scans of the inbox. A file is merged once its '
+                'size and modification time did not change between two scans'
+            ),
+        )
+
+        parser.add_argument(
+            '--max-catalogs',
+            type=int,
+            default=32,
+            help='Number of parsed django.po files (or shards) kept in memory',
+        )
+
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            default=False,
+            help='Merge the files currently in the inbox and exit',
+        )
+
+    def handle(self, *args, **options):
+        self.inbox = Path(options.get('inbox'))
+        self.interval = options.get('interval')
+        self.max_catalogs = options.get('max_catalogs')
+        self.is_dry = False
+        self.is_strict = False
+        self.affected_pages_templates = []
+
+        self.done_dir = self.inbox / DONE_DIR_NAME
+        self.failed_dir = self.inbox / FAILED_DIR_NAME
+        self.done_dir.mkdir(parents=True, exist_ok=True)
+        self.failed_dir.mkdir(parents=True, exist_ok=True)
+
+        # path -> (fingerprint, POFile), least recently used first
+        self.catalogs = OrderedDict()
+        # path -> (fingerprint, first seen), for files that may still be copied
+        self.pending = {}
+        self.stats = Counter(
+            merged=0, failed=0, entries=0, batches=0, catalog_hits=0, catalog_reads=0
+        )
+        # Running totals, the number of latencies is the number of merged files
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.started = time.monotonic()
+
+        if options.get('once'):
+            self.process_batch({path: time.monotonic() for path in self.scan()})
+            self.write_stats()
+            return
+
+        self.stdout.write(f'Watching {self.inbox}, press CTRL-C to stop')
+        try:
+            while True:
+                ready = self.get_ready_files()
+                if ready:
+                    self.process_batch(ready)
+                    self.write_stats()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            self.write_stats()
+
+    def scan(self):
+        return sorted(
+            path
+            for path in self.inbox.glob(f'*/*/{PROJECT_FILE_PREFIX}*.po')
+            if path.parts[-3] not in (DONE_DIR_NAME, FAILED_DIR_NAME)
+        )
+
+    def get_ready_files(self):
+        """Return the files that did not change since the previous scan with
+        the time they were first seen"""
+        ready = {}
+        pending = {}
+
+        for path in self.scan():
+            try:
+                fingerprint = get_file_fingerprint(path)
+            except FileNotFoundError:
+                continue
+
+            previous = self.pending.get(path)
+            if previous and previous[0] == fingerprint:
+                ready[path] = previous[1]
+            else:
+                first_seen = previous[1] if previous else time.monotonic()
+                pending[path] = (fingerprint, first_seen)
+
+        self.pending = pending
+        return ready
+
+    def process_batch(self, files):
+        """Merge a batch of files, grouped by target catalog so each django.po
+        file (or shard) is written once per batch"""
+        groups = defaultdict(list)
+
+        for path, seen in files.items():
+            try:
+                app_label, locale = path.parts[-3:-1]
+                po_file = self.get_django_po_path({'app': app_label, 'locale': locale})
+                project_po = safe_read_pofile(path)
+            except CommandError as error:
+                self.move(path, self.failed_dir, seen, error)
+                continue
+            groups[po_file].append((path, seen, project_po))
+
+        for po_file, items in groups.items():
+            self.merge_group(po_file, items)
+
+    def merge_group(self, po_file, items):
+        changed = {}
+        results = []
+        self.changed_entries = defaultdict(list)
+
+        for path, seen, project_po in items:
+            self.project = path.stem[len(PROJECT_FILE_PREFIX):]
+            self.invalid_entries = []
+            # (catalog path, entry, msgstr, msgstr_plural) before each change
+            self.merged_entries = []
+
+            try:
+                catalog_paths = get_catalog_paths_for_entries(po_file, project_po)
+                django_pos = list(map(self.get_catalog, catalog_paths))
+            except CommandError as error:
+                self.move(path, self.failed_dir, seen, error)
+                continue
+
+            self.merge_project_entries(django_pos, project_po)
+
+            if self.invalid_entries:
+                # A failed file must leave the catalogs as they were
+                self.undo_merged_entries()
+                error = (
+                    f'{len(self.invalid_entries)} invalid translation(s) found, '
+                    'nothing was merged'
+                )
+                self.move(path, self.failed_dir, seen, error)
+                continue
+
+            changed.update((django_po.fpath, django_po) for django_po in django_pos)
+            results.append((path, seen, len(project_po)))
+
+        try:
+            for catalog_path, django_po in changed.items():
+                patch_pofile(django_po, self.changed_entries[catalog_path])
+                self.catalogs[Path(catalog_path)] = (
+                    get_file_fingerprint(Path(catalog_path)),
+                    django_po,
+                )
+        except (IOError, OSError) as error:
+            # The cached catalogs hold changes that were not written
+            for catalog_path in changed:
+                self.catalogs.pop(Path(catalog_path), None)
+            for path, seen, _ in results:
+                self.move(path, self.failed_dir, seen, error)
+            return
+
+        self.stats['batches'] += 1
+        for path, seen, count in results:
+            self.stats['entries'] += count
+            self.move(path, self.done_dir, seen)
+            self.stdout.write(self.style.SUCCESS(f'Merged {count} entries from {path}'))
+
+    def merge_project_entry(self, django_po, entry, project_entry):
+        previous = (entry.msgstr, dict(entry.msgstr_plural))
+        changed_count = len(self.changed_entries[django_po.fpath])
+
+        super().merge_project_entry(django_po, entry, project_entry)
+
+        if len(self.changed_entries[django_po.fpath]) > changed_count:
+            self.merged_entries.append((django_po.fpath, entry, *previous))
+
+    def undo_merged_entries(self):
+        """Restore the translations changed by the current file, newest first so
+        each one is also the last entry queued for its catalog"""
+        for catalog_path, entry, msgstr, msgstr_plural in reversed(self.merged_entries):
+            entry.msgstr = msgstr
+            entry.msgstr_plural = msgstr_plural
+            self.changed_entries[catalog_path].pop()
+
+    def get_catalog(self, catalog_path):
+        """Return a parsed catalog, reusing the one in memory unless the file
+        was changed by someone else in the meantime"""
+        catalog_path = Path(catalog_path)
+        fingerprint = get_file_fingerprint(catalog_path)
+        cached = self.catalogs.pop(catalog_path, None)
+
+        if cached and cached[0] == fingerprint:
+            self.stats['catalog_hits'] += 1
+            django_po = cached[1]
+        else:
+            self.stats['catalog_reads'] += 1
+            django_po = safe_read_pofile(catalog_path)
+
+        self.catalogs[catalog_path] = (fingerprint, django_po)
+        while len(self.catalogs) > self.max_catalogs:
+            self.catalogs.popitem(last=False)
+
+        return django_po
+
+    def move(self, path, target_dir, seen, error=None):
+        target = target_dir / path.relative_to(self.inbox)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            target = target.with_name(f'{target.stem}.{time.time_ns()}{target.suffix}')
+        path.replace(target)
+
+        if error:
+            self.stats['failed'] += 1
+            self.show_warning(f'{path} moved to {target}: {error}')
+        else:
+            self.stats['merged'] += 1
+            latency = time.monotonic() - seen
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def write_stats(self):
+        uptime = time.monotonic() - self.started
+        merged = self.stats['merged']
+        latency_avg = self.latency_total / merged if merged else 0
+        stats = {
+            **self.stats,
+            'uptime_seconds': round(uptime, 1),
+            'files_per_minute': round(60 * self.stats['merged'] / uptime, 2),
+            'latency_avg_seconds': round(latency_avg, 3),
+            'latency_max_seconds': round(self.latency_max, 3),
+        }
+
+        with open(self.inbox / STATS_FILE_NAME, 'w', encoding='utf-8') as stats_file:
+            json.dump(stats, stats_file, indent=2)
+
+        self.stdout.write(
+            f"Merged {stats['merged']} file(s), {stats['failed']} failed, "
+            f"average latency {stats['latency_avg_seconds']}s"
+        )
@@ -0,0 +1,143 @@
+import atexit
+import json
+import os
+import random
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation.trans_real import DjangoTranslation
+
+from .management._traffic import get_traffic_dir
+
+DEFAULT_SAMPLE_RATE = 100
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_FLUSH_INTERVAL = 60
+
+
+class MissingTranslationsRecorder:
+    """Count a sample of the gettext lookups that fall back to the source
+    language, per locale and msgid. Lookups only pay for a random draw, the
+    counts are kept in a bounded dict without locks (a lost increment
+    only makes an estimate slightly lower) and written by a daemon thread"""
+
+    def __init__(self, sample_rate, max_entries, flush_interval, traffic_dir):
+        self.sample_rate = max(sample_rate, 1)
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.traffic_dir = traffic_dir
+        self.traffic_path = traffic_dir / (
+            f'{socket.gethostname()}-{os.getpid()}-{int(time.time())}.json'
+        )
+        self.probability = 1 / self.sample_rate
+        # Set while a lookup runs, so the lookup into the fallback translation
+        # is neither sampled nor counted
+        self.local = threading.local()
+        # (language, msgid) -> sampled lookups
+        self.counts = {}
+        self.dropped = 0
+
+    def install(self):
+        gettext = DjangoTranslation.gettext
+        ngettext = DjangoTranslation.ngettext
+        recorder = self
+
+        local = self.local
+        draw = random.random
+
+        def sampled_gettext(translation, message):
+            if getattr(local, 'lookup', False):
+                return gettext(translation, message)
+            local.lookup = True
+            try:
+                if draw() < recorder.probability:
+                    recorder.record(translation, message, message)
+                return gettext(translation, message)
+            finally:
+                local.lookup = False
+
+        def sampled_ngettext(translation, msgid1, msgid2, n):
+            if getattr(local, 'lookup', False):
+                return ngettext(translation, msgid1, msgid2, n)
+            local.lookup = True
+            try:
+                if draw() < recorder.probability:
+                    recorder.record(translation, msgid1, (msgid1, 0))
+                return ngettext(translation, msgid1, msgid2, n)
+            finally:
+                local.lookup = False
+
+        DjangoTranslation.gettext = sampled_gettext
+        DjangoTranslation.ngettext = sampled_ngettext
+
+        threading.Thread(target=self.run, name='i18n-traffic', daemon=True).start()
+        atexit.register(self.flush)
+
+    def record(self, translation, msgid, catalog_key):
+        language = translation.language()
+        # Lookups in the source language, including the fallback of every other
+        # language, are never missing
+        if language == settings.LANGUAGE_CODE or catalog_key in translation._catalog:
+            return
+
+        key = (language, str(msgid))
+        count = self.counts.get(key)
+        if count is None and len(self.counts) >= self.max_entries:
+            self.dropped += 1
+            return
+        self.counts[key] = (count or 0) + 1
+
+    def run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        locales = {}
+        for (language, msgid), count in dict(self.counts).items():
+            locales.setdefault(language, {})[msgid] = count * self.sample_rate
+
+        self.traffic_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.traffic_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as traffic_file:
+            json.dump(
+                {
+                    'sample_rate': self.sample_rate,
+                    'dropped': self.dropped * self.sample_rate,
+                    'locales': locales,
+                },
+                traffic_file,
+            )
+        temp_path.replace(self.traffic_path)
+
+
+_recorder = None
+
+
+def install_recorder():
+    global _recorder
+
+    if _recorder is None:
+        _recorder = MissingTranslationsRecorder(
+            getattr(settings, 'I18N_TRAFFIC_SAMPLE_RATE', DEFAULT_SAMPLE_RATE),
+            getattr(settings, 'I18N_TRAFFIC_MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+            getattr(settings, 'I18N_TRAFFIC_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+            get_traffic_dir(),
+        )
+        _recorder.install()
+
+    return _recorder
+
+
+class MissingTranslationsMiddleware:
+    """Opt-in middleware that records which missing translations are looked up
+    the most, so tagmessages --by-traffic can tag them first. It only installs
+    the recorder, requests themselves go through untouched"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_recorder()
+
+    def __call__(self, request):
+        return self.get_response(request)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Run the PO workflow commands without setting up Django.
+
+The apps and languages of the project are read from the manifest written by
+`python manage.py manifestmessages`, so neither the settings module nor the
+installed apps are imported. Usage: python pocli.py tagmessages -l de -p jdoe
+"""
+import importlib
+import sys
+
+COMMANDS = (
+    'tagmessages',
+    'extractmessages',
+    'mergemessages',
+    'cleanmessages',
+    'statusmessages',
+)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        sys.stderr.write(
+            f"Usage: {sys.argv[0]} <command> [options]\n"
+            f"Available commands: {', '.join(COMMANDS)}\n"
+        )
+        sys.exit(1)
+
+    from django.conf import settings
+    from django.core.management.base import CommandError
+
+    from app1.management._helpers import use_manifest_apps
+    from app1.management._manifest import get_manifest_apps, read_manifest
+
+    name = sys.argv[1]
+
+    try:
+        manifest = read_manifest()
+    except CommandError as error:
+        sys.stderr.write(f'CommandError: {error}\n')
+        sys.exit(1)
+
+    settings.configure(
+        LANGUAGE_CODE=manifest['language_code'],
+        LANGUAGES=[tuple(language) for language in manifest['languages']],
+        USE_I18N=True,
+    )
+    use_manifest_apps(get_manifest_apps(manifest))
+
+    # Only the requested command, and what it needs, is imported
+    module = importlib.import_module(f'app1.management.commands.{name}')
+    command = module.Command()
+    # System checks need the app registry, which is never populated here
+    command.requires_system_checks = []
+
+    parser = command.create_parser(sys.argv[0], name)
+    options = parser.parse_args(sys.argv[2:])
+    cmd_options = vars(options)
+    args = cmd_options.pop('args', ())
+
+    try:
+        command.execute(*args, **cmd_options)
+    except CommandError as error:
+        sys.stderr.write(f'{error.__class__.__name__}: {error}\n')
+        sys.exit(error.returncode)
+
+
+if __name__ == '__main__':
+    main()